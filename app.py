@@ -8,24 +8,45 @@
 # 3. Gede Dhanu Purnayasa (2415091092)
 ##################################################################
 
+import asyncio
+import bisect
+import csv
+import hashlib
+import io
+import json
+import math
 import random
+import re
+import time
 import uvicorn
 from fastapi.exceptions import RequestValidationError
 from pydantic_core import ErrorDetails
-from pymongo.errors import DuplicateKeyError
-from typing import Literal, Generic, TypeVar, List
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from typing import Literal, Generic, TypeVar, List, Dict
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import ValidationError
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pydantic_settings import SettingsConfigDict
-from fastapi import FastAPI, APIRouter, status, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, status, Request, Depends, Query
+from fastapi import Header
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic_settings import BaseSettings
-from pymongo import AsyncMongoClient
+from pymongo import AsyncMongoClient, ReturnDocument, IndexModel, UpdateOne
+from pymongo import monitoring
 from typing import Optional
 from bson.objectid import ObjectId
-from beanie import init_beanie, Document, Indexed
+from beanie import init_beanie, Document, Indexed, PydanticObjectId
+from beanie import UpdateResponse
+
+# orjson bersifat opsional, jika tidak ter-install akan menggunakan json bawaan
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # [DICT&CONSTANT]
 # Untuk memastikan error code pada response API selalu konsisten.
@@ -68,12 +89,129 @@ ERROR_CODE_DICT = {
         "code": "SERVER-500",
         "message": "failed to generate unique ticket code"
     },
+    "TICKET_CODE_EXHAUSTED": {
+        "code": "SERVER-500",
+        "message": "ticket code pool exhausted"
+    },
     "INVALID_OBJECT_ID": {
         "code": "INVALID_OBJECT_ID",
         "message": "invalid object id format"
+    },
+    "HOLD_NOT_FOUND": {
+        "code": "HOLD_NOT_FOUND",
+        "message": "ticket hold not found"
+    },
+    "HOLD_EXPIRED": {
+        "code": "HOLD_EXPIRED",
+        "message": "ticket hold expired"
+    },
+    "IDEMPOTENCY_KEY_REUSED": {
+        "code": "IDEMPOTENCY_KEY_REUSED",
+        "message": "idempotency key already used for a different request"
+    },
+    "IDEMPOTENCY_KEY_IN_PROGRESS": {
+        "code": "IDEMPOTENCY_KEY_IN_PROGRESS",
+        "message": "request with this idempotency key is still in progress"
+    },
+    "PURCHASE_QUEUE_FULL": {
+        "code": "PURCHASE_QUEUE_FULL",
+        "message": "too many purchase requests, please retry later"
+    },
+    "DELETION_JOB_NOT_FOUND": {
+        "code": "DELETION_JOB_NOT_FOUND",
+        "message": "event deletion job not found"
+    },
+    "DATASET_TOO_LARGE": {
+        "code": "DATASET_TOO_LARGE",
+        "message": "dataset exceeds the remaining ticket code pool"
     }
 }
 
+# Batas maksimal "limit" pada endpoint list agar satu halaman
+# tidak memakan memori terlalu besar
+MAX_PAGE_LIMIT = 1000
+
+# Media type untuk response streaming (satu dokumen JSON per baris)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Batas jumlah tiket dalam satu pembelian bulk
+MAX_BULK_TICKETS = 100
+
+# Batas jumlah scan dalam satu sinkronisasi check-in
+MAX_BATCH_CHECK_IN = 1000
+
+# Batas jumlah bucket (sharded counter) untuk stock tiket sebuah event
+MAX_STOCK_BUCKETS = 64
+
+# Ruang kode tiket "MANBD-100000" s/d "MANBD-999999"
+TICKET_CODE_MIN = 100000
+TICKET_CODE_SPACE = 900000
+# Permutasi (seq * MULTIPLIER + OFFSET) mod SPACE bersifat bijektif selama
+# gcd(MULTIPLIER, SPACE) = 1, sehingga kode tidak berurutan namun tetap unik
+TICKET_CODE_MULTIPLIER = 611953
+TICKET_CODE_OFFSET = 271828
+TICKET_CODE_COUNTER_ID = "ticket_code"
+TICKET_CODE_PATTERN = re.compile(r"^MANBD-(\d{6})$")
+
+# Event yang dimulai dalam rentang ini akan di-index saat aplikasi berjalan
+CHECK_IN_INDEX_LOOKAHEAD = timedelta(days=1)
+# Event yang tidak di-index tidak diperiksa ulang selama rentang ini (detik)
+CHECK_IN_INDEX_SKIP_TTL = 60
+CHECK_IN_INDEX_SKIP_SIZE = 1024
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Jumlah hold kedaluwarsa yang diproses dalam satu putaran pembersihan
+HOLD_SWEEP_BATCH_SIZE = 500
+
+# Job penghapusan tiket yang tidak diperbarui selama rentang ini dianggap
+# berhenti (misal worker mati) dan dilanjutkan oleh worker lain
+EVENT_DELETION_LEASE = timedelta(minutes=1)
+EVENT_DELETION_RESUME_INTERVAL = 30
+
+# Response untuk Idempotency-Key disimpan selama rentang ini (TTL index)
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# Request dengan key yang sama dianggap gagal (worker mati) setelah rentang
+# ini, sehingga retry berikutnya boleh menjalankan ulang pembelian
+IDEMPOTENCY_PENDING_TIMEOUT = timedelta(minutes=1)
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Import event divalidasi dan di-insert per chunk
+IMPORT_CHUNK_SIZE = 500
+# Batas jumlah error per baris yang ditampilkan pada hasil import
+IMPORT_MAX_ERRORS = 1000
+CSV_MEDIA_TYPE = "text/csv"
+# Kolom export event, dapat di-import kembali
+EVENT_EXPORT_FIELDS = [
+    "_id", "name", "description", "start_date", "end_date", "location",
+    "ticket_base_price", "ticket_quota", "stock_buckets"
+]
+
+# Live feed (server-sent events) per event
+SSE_MEDIA_TYPE = "text/event-stream"
+# Komentar SSE agar koneksi tidak ditutup oleh proxy ketika tidak ada update
+LIVE_FEED_HEARTBEAT = 15
+# Snapshot tetap dikirim ulang setelah rentang ini walaupun tanpa perubahan
+LIVE_FEED_RESYNC = 30
+# Jeda sebelum mencoba membuka change stream lagi setelah gagal
+LIVE_FEED_RETRY = 30
+# Subscriber yang lambat hanya menyimpan update terbaru
+LIVE_FEED_QUEUE_SIZE = 8
+
+# Jumlah tiket per insert_many saat membuat dataset sintetis
+SEED_BATCH_SIZE = 5000
+# Quota event sintetis = tiket terjual x rasio ini (sisanya masih dijual)
+SEED_QUOTA_RATIO = 2
+SEED_LOCATIONS = [
+    "Bali", "Jakarta", "Bandung", "Surabaya", "Yogyakarta", "Medan",
+    "Makassar", "Semarang"
+]
+SEED_BASE_PRICES = [50000, 100000, 150000, 250000, 500000, 1000000]
+
+# Batas atas bucket histogram latency request (detik)
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                        5.0, 10.0)
+
 # [/DICT&CONTSTANT]
 
 
@@ -89,6 +227,63 @@ class Settings(BaseSettings):
     db_name: str = "ticketingsystem"
     host: str = "0.0.0.0"
     port: int = 8050
+    # Jumlah proses uvicorn, setiap worker memiliki connection pool sendiri
+    workers: int = 1
+    # Connection pool per worker (lihat SETUP.md untuk penentuan ukuran)
+    db_max_pool_size: int = 100
+    db_min_pool_size: int = 0
+    db_max_connecting: int = 2
+    # Kompresi wire protocol, misal "zstd,zlib" ("" = tanpa kompresi)
+    db_compressors: str = ""
+    # "primary", "primaryPreferred", "secondary", "secondaryPreferred",
+    # atau "nearest"
+    db_read_preference: str = "primary"
+    # Membuat index saat startup. Untuk collection besar, nonaktifkan dan
+    # buat index terlebih dahulu dengan "python manage.py indexes"
+    db_create_indexes: bool = True
+    # Waiting room pembelian: jumlah pembelian paralel per event di setiap
+    # worker, sisanya mengantri (0 = nonaktif)
+    purchase_concurrency: int = 64
+    purchase_queue_size: int = 1000
+    purchase_queue_timeout: float = 10
+    # Token bucket lintas worker (pembelian/detik per event, 0 = nonaktif)
+    purchase_rate: float = 0
+    purchase_burst: int = 100
+    # Event yang stock-nya habis langsung ditolak tanpa query (detik)
+    sold_out_cache_ttl: float = 2
+    # Masa berlaku reservasi tiket (hold) sebelum stock dikembalikan (detik)
+    ticket_hold_ttl: float = 600
+    # Interval background task yang mengembalikan hold kedaluwarsa (detik)
+    hold_sweep_interval: float = 5
+    # Interval pengiriman update live feed (detik). Tanpa replica set,
+    # live feed melakukan polling per event dengan interval yang sama
+    live_feed_interval: float = 1
+    live_feed_change_stream: bool = True
+    # Tiket dari event yang dihapus dihapus per chunk di background,
+    # dengan jeda antar chunk agar tidak membebani primary (detik)
+    event_delete_chunk_size: int = 1000
+    event_delete_pause: float = 0.05
+    # Transaction membutuhkan MongoDB replica set / sharded cluster
+    db_use_transactions: bool = False
+    # Cache untuk detail dan daftar event (detik, 0 = nonaktif)
+    event_cache_ttl: float = 30
+    event_cache_size: int = 1024
+    # Stock berubah setiap ada pembelian sehingga masa berlakunya singkat
+    stock_cache_ttl: float = 1
+    # Response list di-encode langsung tanpa validasi ulang APIResponse
+    fast_json_response: bool = True
+    # Endpoint baca mengambil dict langsung dari collection (tanpa Beanie)
+    raw_read_queries: bool = True
+    # Index in-memory untuk check-in berdasarkan kode tiket
+    check_in_index: bool = False
+    # Jumlah event maksimal pada index check-in per worker (~900KB per event)
+    check_in_index_max_events: int = 32
+    # Jumlah kode tiket yang di-reserve sekaligus oleh setiap worker
+    ticket_code_block_size: int = 100
+    # Histogram latency dan command MongoDB pada endpoint /metrics
+    metrics_enabled: bool = True
+    # Menambahkan header "Server-Timing" (durasi aplikasi dan MongoDB)
+    server_timing_header: bool = False
 
 
 class ErrorModel(BaseModel):
@@ -127,6 +322,61 @@ class APIResponse(BaseModel, Generic[T]):
         return self
 
 
+def _json_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} "
+                    "is not JSON serializable")
+
+
+def encode_json(content) -> bytes:
+    """
+    Encode JSON menggunakan orjson jika tersedia. Mendukung model Pydantic
+    dan dict BSON mentah (ObjectId, datetime) dari Mongo
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default)
+    return json.dumps(content, default=_json_default,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    Response JSON yang di-encode langsung (orjson jika tersedia)
+    tanpa melalui validasi "response_model" milik FastAPI
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+def build_response(fast_json: bool, *, message: str, data, meta: dict):
+    """
+    Membuat response sukses. Pada mode "fast_json", envelope dibentuk sekali
+    sebagai dict dengan struktur yang sama persis seperti APIResponse
+    """
+    if not fast_json:
+        return APIResponse(success=True,
+                           message=message,
+                           data=data,
+                           meta=meta)
+
+    return FastJSONResponse({
+        "success": True,
+        "message": message,
+        "data": data,
+        "error": None,
+        "meta": {
+            **meta, "timestamp": datetime.now().isoformat()
+        }
+    })
+
+
 class APIError(Exception):
     """
     Exception khusus untuk API yang akan
@@ -137,8 +387,12 @@ class APIError(Exception):
     def __init__(self,
                  status_code: int,
                  error_code: str,
-                 error_message: str = None):
+                 error_message: str = None,
+                 data=None,
+                 headers: Optional[Dict[str, str]] = None):
         self.status_code = status_code
+        self.data = data
+        self.headers = headers
 
         if error_code in ERROR_CODE_DICT:
             self.error_code = ERROR_CODE_DICT[error_code]["code"]
@@ -149,9 +403,89 @@ class APIError(Exception):
             self.error_message = error_message
 
 
+class TTLCache():
+    """
+    Cache LRU in-memory dengan masa berlaku (TTL) per entri.
+    Cache hanya berlaku di satu worker, sehingga invalidasi dari worker
+    lain baru terlihat setelah TTL habis
+    """
+
+    def __init__(self, *, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
 # digunakana ketika membuat ticket (membeli tiket)
-def generate_ticket_code():
-    return f"MANBD-{random.randint(100000, 999999)}"
+def generate_ticket_code(seq: int):
+    number = (seq * TICKET_CODE_MULTIPLIER +
+              TICKET_CODE_OFFSET) % TICKET_CODE_SPACE
+    return f"MANBD-{TICKET_CODE_MIN + number}"
+
+
+# Jika menggunakan pembayaran "online" maka
+# akan ditambahkan sebesar 25% dari base_price
+def calculate_final_price(base_price: float,
+                          payment_method: Literal["cash", "online"]):
+    if payment_method == "online":
+        return base_price + base_price * 0.25
+    return base_price
+
+
+# Mengambil bagian angka dari kode tiket ("MANBD-123456" -> 23456)
+# sebagai posisi pada ruang kode, None jika format kode tidak valid
+def parse_ticket_code(code: str):
+    match = TICKET_CODE_PATTERN.match(code)
+    if not match or int(match.group(1)) < TICKET_CODE_MIN:
+        return None
+    return int(match.group(1)) - TICKET_CODE_MIN
+
+
+# Memastikan apakah error dari insert disebabkan oleh kode tiket yang duplikat
+def is_duplicate_key_error(exc: Exception):
+    if isinstance(exc, DuplicateKeyError):
+        return True
+    if isinstance(exc, BulkWriteError):
+        write_errors = exc.details.get("writeErrors", [])
+        return bool(write_errors) and all(
+            error["code"] == 11000 for error in write_errors)
+    return False
 
 
 # menggunakan "Depends" pattern untuk memastikan bahwa id yang diterima adalah valid
@@ -170,6 +504,342 @@ def valid_ticket_id(ticket_id: str):
     return validate_object_id(ticket_id)
 
 
+def valid_hold_id(hold_id: str):
+    return validate_object_id(hold_id)
+
+
+def valid_job_id(job_id: str):
+    return validate_object_id(job_id)
+
+
+def ticket_event_filter(event_id):
+    """
+    Filter "event_id" pada tickets_sold. Tiket lama menyimpan event_id
+    sebagai string sampai "manage.py migrate-event-ids" selesai, sehingga
+    kedua bentuk dicocokkan (tetap menggunakan index event_id)
+    """
+    return {"$in": [ObjectId(event_id), str(event_id)]}
+
+
+def valid_cursor(after: Optional[str] = None):
+    if after is None:
+        return None
+    return validate_object_id(after)
+
+
+def after_cursor_filter(after: Optional[str]):
+    """
+    Filter keyset pagination: hanya mengambil dokumen dengan "_id"
+    yang lebih besar dari cursor sebelumnya
+    """
+    if after is None:
+        return {}
+    return {"_id": {"$gt": ObjectId(after)}}
+
+
+def split_page(items: list, limit: Optional[int]):
+    """
+    Memisahkan hasil query (yang diambil sebanyak limit + 1) menjadi
+    item halaman ini dan "next_cursor" untuk halaman berikutnya
+    """
+    if limit is None or len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, str(last["_id"] if isinstance(last, dict) else last.id)
+
+
+async def ndjson_stream(query):
+    """
+    Mengubah cursor Mongo menjadi stream NDJSON. Dokumen dikirim
+    satu per satu sehingga memori tetap datar berapapun jumlahnya
+    """
+    async for item in query:
+        yield encode_json(item) + b"\n"
+
+
+async def iter_lines(chunks):
+    """
+    Memecah stream bytes menjadi baris tanpa membaca seluruh isi ke memori
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_ndjson_rows(chunks):
+    """
+    Menghasilkan (nomor baris, dict) atau (nomor baris, error)
+    """
+    row = 0
+    async for line in iter_lines(chunks):
+        row += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, ValueError(f"invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield row, ValueError("row must be a JSON object")
+            continue
+        yield row, record
+
+
+async def iter_csv_rows(chunks):
+    """
+    Sama seperti iter_ndjson_rows untuk CSV dengan header. Field yang
+    mengandung baris baru (di dalam tanda kutip) tetap didukung
+    """
+    header = None
+    record = ""
+    row = 0
+    async for line in iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        # Tanda kutip ganjil berarti field belum ditutup
+        if record.count('"') % 2:
+            continue
+        values, record = next(csv.reader([record]), []), ""
+        if header is None:
+            header = values
+            continue
+        row += 1
+        if not any(values):
+            continue
+        if len(values) != len(header):
+            yield row, ValueError(
+                f"expected {len(header)} columns, got {len(values)}")
+            continue
+        # Kolom kosong menggunakan nilai default
+        yield row, {
+            key: value for key, value in zip(header, values) if value != ""
+        }
+
+
+def csv_line(values) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([
+        value.isoformat() if isinstance(value, datetime) else
+        "" if value is None else value for value in values
+    ])
+    return buffer.getvalue().encode()
+
+
+def sse_message(event: str, data) -> bytes:
+    return f"event: {event}\ndata: ".encode() + encode_json(data) + b"\n\n"
+
+
+def projection_of(model) -> dict:
+    return {
+        field.alias or name: 1 for name, field in model.model_fields.items()
+    }
+
+
+def find_raw(document, query: dict, projection_model,
+             limit: Optional[int]):
+    """
+    Query langsung ke collection milik Document dengan projection di sisi
+    server. Menghasilkan dict BSON tanpa membuat objek Pydantic per dokumen,
+    validasi hanya dilakukan ketika menulis data
+    """
+    cursor = document.get_pymongo_collection().find(
+        query, projection_of(projection_model)).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+class RequestTiming():
+    """
+    Akumulasi waktu command MongoDB untuk satu request
+    """
+    __slots__ = ("mongo_commands", "mongo_seconds")
+
+    def __init__(self):
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+
+
+# Diisi oleh MetricsMiddleware, dibaca oleh MongoCommandListener
+current_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "current_request_timing", default=None)
+
+
+class RequestMetrics():
+    """
+    Histogram latency per route serta jumlah dan durasi command MongoDB.
+    Data hanya berlaku di satu worker (sama seperti TTLCache), sehingga
+    Prometheus perlu men-scrape setiap worker
+    """
+
+    def __init__(self, *, buckets=HTTP_LATENCY_BUCKETS):
+        self.buckets = buckets
+        # (method, route) -> [jumlah per bucket, total detik, jumlah request,
+        #                     jumlah command mongo, total detik mongo]
+        self.routes: Dict[tuple, list] = {}
+        # nama command -> [jumlah, total detik, jumlah gagal]
+        self.commands: Dict[str, list] = {}
+
+    def observe_request(self, method: str, route: str, seconds: float,
+                        timing: RequestTiming):
+        entry = self.routes.get((method, route))
+        if entry is None:
+            entry = [[0] * (len(self.buckets) + 1), 0.0, 0, 0, 0.0]
+            self.routes[(method, route)] = entry
+        entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+        entry[2] += 1
+        entry[3] += timing.mongo_commands
+        entry[4] += timing.mongo_seconds
+
+    def observe_command(self, name: str, seconds: float, failed: bool):
+        entry = self.commands.get(name)
+        if entry is None:
+            entry = [0, 0.0, 0]
+            self.commands[name] = entry
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += failed
+
+        timing = current_request_timing.get()
+        if timing is not None:
+            timing.mongo_commands += 1
+            timing.mongo_seconds += seconds
+
+    def render(self):
+        """
+        Format text exposition milik Prometheus
+        """
+        lines = [
+            "# HELP http_request_duration_seconds Latency request per route",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        for (method, route), entry in self.routes.items():
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),),
+                                    entry[0]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket'
+                             f'{{{labels},le="{le}"}} {cumulative}')
+            lines.append(
+                f"http_request_duration_seconds_sum{{{labels}}} {entry[1]}")
+            lines.append(
+                f"http_request_duration_seconds_count{{{labels}}} {entry[2]}")
+
+        lines += [
+            "# HELP http_request_mongo_commands_total Command MongoDB per route",
+            "# TYPE http_request_mongo_commands_total counter"
+        ]
+        for (method, route), entry in self.routes.items():
+            lines.append(f'http_request_mongo_commands_total'
+                         f'{{method="{method}",route="{route}"}} {entry[3]}')
+
+        lines += [
+            "# HELP http_request_mongo_seconds_total Waktu MongoDB per route",
+            "# TYPE http_request_mongo_seconds_total counter"
+        ]
+        for (method, route), entry in self.routes.items():
+            lines.append(f'http_request_mongo_seconds_total'
+                         f'{{method="{method}",route="{route}"}} {entry[4]}')
+
+        lines += [
+            "# HELP mongo_commands_total Command MongoDB yang dijalankan",
+            "# TYPE mongo_commands_total counter"
+        ]
+        for name, entry in self.commands.items():
+            lines.append(f'mongo_commands_total{{command="{name}"}} {entry[0]}')
+
+        lines += [
+            "# HELP mongo_command_seconds_total Durasi command MongoDB",
+            "# TYPE mongo_command_seconds_total counter"
+        ]
+        for name, entry in self.commands.items():
+            lines.append(
+                f'mongo_command_seconds_total{{command="{name}"}} {entry[1]}')
+
+        lines += [
+            "# HELP mongo_command_failures_total Command MongoDB yang gagal",
+            "# TYPE mongo_command_failures_total counter"
+        ]
+        for name, entry in self.commands.items():
+            lines.append(
+                f'mongo_command_failures_total{{command="{name}"}} {entry[2]}')
+
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Listener PyMongo yang mencatat setiap command ke RequestMetrics.
+    Listener dipanggil di task yang menjalankan command, sehingga
+    ContextVar milik request masih dapat dibaca
+    """
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.metrics.observe_command(event.command_name,
+                                     event.duration_micros / 1e6, False)
+
+    def failed(self, event):
+        self.metrics.observe_command(event.command_name,
+                                     event.duration_micros / 1e6, True)
+
+
+class MetricsMiddleware():
+    """
+    Middleware ASGI untuk mengukur latency setiap request. Label route
+    menggunakan template path (misal "/api/v1/events/{event_id}") agar
+    jumlah label tetap kecil
+    """
+
+    def __init__(self, app, *, metrics: RequestMetrics, server_timing: bool):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timing = RequestTiming()
+        token = current_request_timing.set(timing)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = (time.perf_counter() - started) * 1000
+                header = (f'app;dur={elapsed:.2f}, '
+                          f'db;dur={timing.mongo_seconds * 1000:.2f};'
+                          f'desc="{timing.mongo_commands} commands"')
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive,
+                           send_with_timing if self.server_timing else send)
+        finally:
+            current_request_timing.reset(token)
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"], route.path if route else "unmatched",
+                time.perf_counter() - started, timing)
+
+
 # [/UTIL]
 
 
@@ -178,17 +848,91 @@ class TicketSold(Document):
     """
     Model untuk tiket yang telah terjual
     """
-    event_id: str = Indexed()
+    # Disimpan sebagai ObjectId (12 byte) agar index lebih kecil,
+    # pada response tetap di-serialize sebagai string
+    event_id: PydanticObjectId
     code: str = Indexed(unique=True)
     payment_method: Literal["cash", "online"]
     base_price: float
     final_price: float
-    status: Literal["used", "unused"] = Indexed()
+    status: Literal["used", "unused"]
     used_at: Optional[datetime] = None
+    # Salinan waktu event agar check-in cukup satu query
+    event_start_date: Optional[datetime] = None
+    event_end_date: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.now)
 
     class Settings:
         name = "tickets_sold"
+        indexes = [
+            # Daftar tiket per event dengan keyset pagination ("_id")
+            IndexModel([("event_id", 1), ("_id", 1)], name="event_id_id"),
+            # Rekap insights (jumlah tiket terpakai) per event
+            IndexModel([("event_id", 1), ("status", 1)],
+                       name="event_id_status"),
+        ]
+
+
+class TicketHold(Document):
+    """
+    Model untuk reservasi tiket sementara. Stock sudah dikurangi ketika
+    hold dibuat, tiket baru diterbitkan ketika hold dikonfirmasi
+    """
+    event_id: PydanticObjectId = Indexed()
+    payment_method: Literal["cash", "online"]
+    quantity: int
+    expires_at: datetime = Indexed()
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "ticket_holds"
+
+
+class IdempotencyRecord(Document):
+    """
+    Model untuk response pertama dari request dengan header
+    "Idempotency-Key" (id = key). Dihapus otomatis oleh TTL index
+    """
+    id: str
+    fingerprint: str
+    completed: bool = False
+    status_code: Optional[int] = None
+    response: Optional[dict] = None
+    # TTL index MongoDB membandingkan waktu dalam UTC
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("created_at", 1)],
+                       expireAfterSeconds=int(
+                           IDEMPOTENCY_KEY_TTL.total_seconds()))
+        ]
+
+
+class EventDeletionJob(Document):
+    """
+    Model untuk proses penghapusan tiket dari event yang sudah dihapus.
+    Tiket dihapus per chunk berdasarkan range "_id" dan posisi terakhir
+    disimpan, sehingga job dapat dilanjutkan oleh worker lain
+    """
+    event_id: PydanticObjectId
+    status: Literal["running", "completed"] = "running"
+    total_tickets: int = 0
+    deleted_tickets: int = 0
+    last_id: Optional[PydanticObjectId] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    class Settings:
+        name = "event_deletion_jobs"
+        indexes = [
+            IndexModel([("status", 1), ("updated_at", 1)],
+                       name="status_updated_at")
+        ]
 
 
 class Event(Document):
@@ -203,12 +947,79 @@ class Event(Document):
     ticket_base_price: float
     ticket_quota: int
     ticket_stock: int
+    # Jika lebih dari 1, stock disimpan pada StockBucket
+    # dan "ticket_stock" pada dokumen ini selalu bernilai 0
+    stock_buckets: int = 1
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
     class Settings:
         name = "events"
+        indexes = [
+            # Event yang sedang / akan berlangsung
+            IndexModel([("start_date", 1), ("end_date", 1)],
+                       name="start_date_end_date"),
+        ]
+
+
+class EventStats(Document):
+    """
+    Model untuk rangkuman event yang diperbarui secara incremental
+    setiap kali tiket dibeli, dihapus, atau digunakan
+    """
+    event_id: PydanticObjectId = Indexed(unique=True)
+    total_revenue: float = 0
+    ticket_sold_count: int = 0
+    total_attendees: int = 0
+
+    class Settings:
+        name = "event_stats"
+
+
+class StockBucket(Document):
+    """
+    Model untuk pecahan stock tiket sebuah event (sharded counter)
+    agar pembelian tidak selalu menulis ke dokumen event yang sama
+    """
+    event_id: PydanticObjectId
+    index: int
+    ticket_stock: int
+
+    class Settings:
+        name = "stock_buckets"
+        indexes = [IndexModel([("event_id", 1), ("index", 1)], unique=True)]
+
+
+class Counter(Document):
+    """
+    Model untuk counter sequence (misalnya alokasi kode tiket)
+    """
+    id: str
+    value: int = 0
+
+    class Settings:
+        name = "counters"
+
+
+class PurchaseRateBucket(Document):
+    """
+    Token bucket pembelian per event yang dibagi oleh semua worker
+    (id = event_id)
+    """
+    id: str
+    tokens: float
+    updated_at: datetime
+    granted: bool = False
+
+    class Settings:
+        name = "purchase_rate_buckets"
+
 
+# Semua document yang didaftarkan ke Beanie
+DOCUMENT_MODELS = [
+    Event, TicketSold, Counter, StockBucket, EventStats, PurchaseRateBucket,
+    TicketHold, IdempotencyRecord, EventDeletionJob
+]
 
 # [/ENTITY]
 
@@ -222,6 +1033,7 @@ class CreateEventRequest(BaseModel):
     location: str = Field(min_length=3)
     ticket_base_price: float = Field(ge=0)
     ticket_quota: int = Field(gt=0)
+    stock_buckets: int = Field(default=1, ge=1, le=MAX_STOCK_BUCKETS)
 
     @model_validator(mode="after")
     def validate_dates(self) -> 'CreateEventRequest':
@@ -231,6 +1043,7 @@ class CreateEventRequest(BaseModel):
 
 
 class EventListResponse(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
     name: str
     description: str
     start_date: datetime
@@ -238,6 +1051,7 @@ class EventListResponse(BaseModel):
 
 
 class EventDetailResponse(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
     name: str
     description: str
     start_date: datetime
@@ -246,15 +1060,42 @@ class EventDetailResponse(BaseModel):
     ticket_base_price: float
     ticket_quota: int
     ticket_stock: int
+    stock_buckets: int = 1
 
 
 class EventInsightResponse(BaseModel):
     total_revenue: float
     total_attendees: int
     ticket_sold_count: int
+    ticket_stock: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class EventImportResponse(BaseModel):
+    inserted: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    # Maksimal IMPORT_MAX_ERRORS baris pertama yang gagal
+    errors: List[ImportRowError] = []
+
+
+class CreateTicketHoldRequest(BaseModel):
+    payment_method: Literal["cash", "online"]
+    quantity: int = Field(default=1, gt=0, le=MAX_BULK_TICKETS)
+
+
+class TicketCodePoolResponse(BaseModel):
+    total: int
+    allocated: int
+    remaining: int
 
 
 class TicketListResponse(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
     code: str
     base_price: float
     final_price: float
@@ -266,20 +1107,1135 @@ class CreateTicketRequest(BaseModel):
     payment_method: Literal["cash", "online"]
 
 
+class CreateBulkTicketRequest(BaseModel):
+    payment_method: Literal["cash", "online"]
+    quantity: int = Field(gt=0, le=MAX_BULK_TICKETS)
+
+
+class CheckInScan(BaseModel):
+    ticket_id: Optional[str] = None
+    code: Optional[str] = None
+    scanned_at: datetime
+
+    @model_validator(mode="after")
+    def validate_scan(self) -> 'CheckInScan':
+        if not self.ticket_id and not self.code:
+            raise ValueError("either ticket_id or code is required")
+        # Waktu disimpan tanpa timezone (waktu lokal server)
+        if self.scanned_at.tzinfo is not None:
+            self.scanned_at = self.scanned_at.astimezone().replace(
+                tzinfo=None)
+        # BSON date hanya menyimpan milidetik, dibulatkan ke bawah agar
+        # sama dengan "used_at" yang dibaca kembali dari Mongo
+        self.scanned_at = self.scanned_at.replace(
+            microsecond=self.scanned_at.microsecond // 1000 * 1000)
+        return self
+
+
+class BatchCheckInRequest(BaseModel):
+    scans: List[CheckInScan] = Field(min_length=1,
+                                     max_length=MAX_BATCH_CHECK_IN)
+
+
+class CheckInScanResult(BaseModel):
+    ticket_id: Optional[str] = None
+    code: Optional[str] = None
+    result: Literal["used", "already_used", "invalid"]
+    error_code: Optional[str] = None
+
+
+class BatchCheckInResponse(BaseModel):
+    used_count: int
+    already_used_count: int
+    invalid_count: int
+    results: List[CheckInScanResult]
+
+
+class DatasetSpec(BaseModel):
+    """
+    Parameter dataset sintetis. Default-nya dataset seragam: popularitas
+    sama, semua event aktif, tanpa check-in
+    """
+    events: int = Field(ge=0)
+    # Dibatasi ruang kode tiket (TICKET_CODE_SPACE) pada database
+    tickets: int = Field(ge=0)
+    seed: Optional[int] = None
+    # 0 = seragam, ~1 = distribusi Zipf (sedikit event sangat populer)
+    skew: float = Field(default=0, ge=0)
+    online_ratio: float = Field(default=0.5, ge=0, le=1)
+    # Peluang tiket dari event yang sudah dimulai telah digunakan
+    check_in_ratio: float = Field(default=0, ge=0, le=1)
+    # Sisanya event yang sudah selesai atau akan datang
+    active_ratio: float = Field(default=1, ge=0, le=1)
+    sold_out_ratio: float = Field(default=0, ge=0, le=1)
+    batch_size: int = Field(default=SEED_BATCH_SIZE, gt=0)
+    concurrency: int = Field(default=1, gt=0)
+    # Waktu acuan tanggal event, default waktu sekarang
+    reference: Optional[datetime] = None
+
+
+class DatasetSummary(BaseModel):
+    events: int = 0
+    tickets: int = 0
+    checked_in: int = 0
+
+
+class DatabaseResetResponse(BaseModel):
+    mode: Literal["drop", "delete"]
+    seeded_events: int = 0
+    seeded_tickets: int = 0
+    duration_ms: float
+
+
 # [/RequestResponse]
 
 
 # [SERVICE]
+class StockService():
+    """
+    Mengelola stock tiket event. Secara default stock disimpan pada
+    "Event.ticket_stock", sedangkan event dengan "stock_buckets" > 1
+    menyimpan stock-nya pada beberapa dokumen StockBucket
+    """
+
+    def __init__(self, *, stock_cache: TTLCache, sold_out_cache: TTLCache):
+        self.stock_cache = stock_cache
+        self.sold_out_cache = sold_out_cache
+        # Event yang diketahui sharded langsung mengambil stock dari bucket
+        self._sharded_events = set()
+
+    def is_sold_out(self, event_id: str):
+        """
+        Flag yang di-cache ketika pembelian gagal karena stock habis.
+        Stock yang kembali di worker lain baru terlihat setelah TTL habis
+        """
+        return self.sold_out_cache.get(event_id) is not None
+
+    def _invalidate(self, event_id: str):
+        self.stock_cache.invalidate(event_id)
+        self.sold_out_cache.invalidate(event_id)
+
+    def _split_stock(self, total: int, stock_buckets: int):
+        share, remainder = divmod(total, stock_buckets)
+        return [
+            share + (1 if index < remainder else 0)
+            for index in range(stock_buckets)
+        ]
+
+    async def get_stock(self, event: Event):
+        if event.stock_buckets <= 1:
+            return event.ticket_stock
+
+        total = await StockBucket.find({
+            "event_id": event.id
+        }).sum("ticket_stock")
+        return int(total or 0)
+
+    async def get_cached_stock(self, event_id: str):
+        """
+        Stock dengan TTL singkat untuk endpoint yang sering di-poll
+        """
+        ticket_stock = self.stock_cache.get(event_id)
+        if ticket_stock is not None:
+            return ticket_stock
+
+        event = await Event.find_one({"_id": ObjectId(event_id)})
+        ticket_stock = await self.get_stock(event) if event else 0
+        self.stock_cache.set(event_id, ticket_stock)
+        return ticket_stock
+
+    async def _find_event(self, event_id: str, session=None):
+        event = await Event.find_one({"_id": ObjectId(event_id)},
+                                     session=session)
+        if not event:
+            self._sharded_events.discard(event_id)
+            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                           error_code="EVENT_NOT_FOUND")
+        return event
+
+    async def _raise_exhausted(self, event: Event):
+        if await self.get_stock(event) == 0:
+            self.sold_out_cache.set(str(event.id), True)
+        raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
+                       error_code="QUOTA_EXHAUSTED")
+
+    async def _reserve_sharded(self, event: Event, quantity: int, session):
+        if await self._reserve_from_buckets(event, quantity, session):
+            self.stock_cache.invalidate(str(event.id))
+            return event
+        await self._raise_exhausted(event)
+
+    async def reserve(self, event_id: str, quantity: int = 1, session=None):
+        # "ticket_stock" event sharded selalu 0, sehingga update ke dokumen
+        # event dilewati dan cukup membaca event untuk harga
+        if event_id in self._sharded_events:
+            event = await self._find_event(event_id, session)
+            if event.stock_buckets > 1:
+                return await self._reserve_sharded(event, quantity, session)
+            # Jumlah bucket diubah oleh worker lain
+            self._sharded_events.discard(event_id)
+
+        # Membaca harga dan mengurangi stock dalam satu round trip
+        # Menggunakan atomic operator untuk menghindari race condition
+        event = await Event.find_one(
+            {
+                "_id": ObjectId(event_id),
+                "ticket_stock": {
+                    "$gte": quantity
+                }
+            },
+            session=session).update(
+                {"$inc": {
+                    "ticket_stock": -quantity
+                }},
+                session=session,
+                response_type=UpdateResponse.NEW_DOCUMENT)
+        if event:
+            self.stock_cache.invalidate(event_id)
+            return event
+
+        # Query tambahan hanya dilakukan ketika pembelian gagal
+        # untuk membedakan event tidak ada dengan stock habis
+        event = await self._find_event(event_id, session)
+        if event.stock_buckets > 1:
+            self._sharded_events.add(event_id)
+            return await self._reserve_sharded(event, quantity, session)
+        await self._raise_exhausted(event)
+
+    async def _take_from_bucket(self,
+                                event_id: ObjectId,
+                                index: int,
+                                amount: int,
+                                session=None):
+        result = await StockBucket.find_one(
+            {
+                "event_id": event_id,
+                "index": index,
+                "ticket_stock": {
+                    "$gte": amount
+                }
+            },
+            session=session).update({"$inc": {
+                "ticket_stock": -amount
+            }},
+                                    session=session)
+        return result.modified_count == 1
+
+    async def _reserve_from_buckets(self,
+                                    event: Event,
+                                    quantity: int,
+                                    session=None):
+        # Bucket dipilih secara acak agar penulisan tersebar
+        for index in random.sample(range(event.stock_buckets),
+                                   event.stock_buckets):
+            if await self._take_from_bucket(event.id, index, quantity,
+                                            session):
+                return True
+
+        if quantity == 1:
+            return False
+
+        # Tidak ada satu bucket pun yang cukup,
+        # stock diambil sebagian dari beberapa bucket
+        taken = []
+        remaining = quantity
+        buckets = await StockBucket.find(
+            {
+                "event_id": event.id,
+                "ticket_stock": {
+                    "$gt": 0
+                }
+            },
+            session=session).to_list()
+        if not buckets:
+            return False
+        for bucket in buckets:
+            amount = min(bucket.ticket_stock, remaining)
+            if await self._take_from_bucket(event.id, bucket.index, amount,
+                                            session):
+                taken.append((bucket.index, amount))
+                remaining -= amount
+            if remaining == 0:
+                return True
+
+        # Stock tidak mencukupi, kembalikan yang sudah terambil
+        if taken:
+            await StockBucket.get_pymongo_collection().bulk_write(
+                [
+                    UpdateOne({
+                        "event_id": event.id,
+                        "index": index
+                    }, {"$inc": {
+                        "ticket_stock": amount
+                    }}) for index, amount in taken
+                ],
+                session=session)
+        return False
+
+    async def release(self, event_id: str, amount: int = 1):
+        self._invalidate(event_id)
+        result = await Event.find_one({
+            "_id": ObjectId(event_id),
+            "stock_buckets": {
+                "$not": {
+                    "$gt": 1
+                }
+            }
+        }).update({"$inc": {
+            "ticket_stock": amount
+        }})
+        if result.matched_count == 0:
+            await StockBucket.find_one({
+                "event_id": ObjectId(event_id),
+                "index": 0
+            }).update({"$inc": {
+                "ticket_stock": amount
+            }})
+
+    async def create(self, event: Event):
+        """
+        Memindahkan stock awal event ke dalam bucket (jika sharded)
+        """
+        if event.stock_buckets <= 1:
+            return
+        await self._distribute(event.id, event.ticket_quota,
+                               event.stock_buckets)
+
+    async def change_quota(self, event: Event, quota_diff: int,
+                           stock_buckets: int):
+        """
+        Menerapkan perubahan quota dan/atau jumlah bucket. Stock dikumpulkan
+        (drain) secara atomic per dokumen sebelum didistribusikan ulang,
+        sehingga tidak ada stock yang terjual dua kali. Selama proses ini
+        pembelian pada event tersebut dapat gagal dengan QUOTA_EXHAUSTED
+        """
+        # Jumlah bucket pada event diubah sebelum drain, sehingga release
+        # yang terjadi selama proses ini ikut terkumpul atau langsung masuk
+        # ke lokasi stock yang baru
+        await self._set_stock_buckets(event.id, stock_buckets)
+        drained = await self._drain(event.id)
+        total = drained + quota_diff
+        if total < 0:
+            await self._distribute(event.id, drained, stock_buckets)
+            if stock_buckets != event.stock_buckets:
+                await self.change_quota(event, 0, event.stock_buckets)
+            raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
+                           error_code="INVALID_QUOTA")
+        await self._distribute(event.id, total, stock_buckets)
+
+    async def adjust_quota(self, event: Event, quota_diff: int):
+        """
+        Menerapkan perubahan quota pada event sharded tanpa mengubah jumlah
+        bucket. Selisih quota cukup di-increment pada satu bucket, drain dan
+        distribusi ulang hanya dilakukan jika tidak ada satu bucket pun yang
+        stocknya cukup untuk pengurangan quota
+        """
+        if quota_diff == 0:
+            return
+        self._invalidate(str(event.id))
+        if quota_diff > 0:
+            await StockBucket.find_one({
+                "event_id": event.id,
+                "index": 0
+            }).update({"$inc": {
+                "ticket_stock": quota_diff
+            }})
+            return
+        for index in range(event.stock_buckets):
+            if await self._take_from_bucket(event.id, index, -quota_diff):
+                return
+        await self.change_quota(event, quota_diff, event.stock_buckets)
+
+    async def _set_stock_buckets(self, event_id: ObjectId, stock_buckets: int):
+        if stock_buckets > 1:
+            # Bucket tujuan release harus sudah ada sebelum event sharded
+            await StockBucket.get_pymongo_collection().update_one(
+                {
+                    "event_id": event_id,
+                    "index": 0
+                }, {"$inc": {
+                    "ticket_stock": 0
+                }},
+                upsert=True)
+        await Event.find_one({
+            "_id": event_id
+        }).update({"$set": {
+            "stock_buckets": stock_buckets
+        }})
+
+    async def delete(self, event_id: str):
+        self._invalidate(event_id)
+        self._sharded_events.discard(event_id)
+        await StockBucket.find({"event_id": ObjectId(event_id)}).delete()
+
+    async def _drain(self, event_id: ObjectId):
+        self.stock_cache.invalidate(str(event_id))
+        reset = {"$set": {"ticket_stock": 0}}
+        event = await Event.find_one({
+            "_id": event_id
+        }).update(reset, response_type=UpdateResponse.OLD_DOCUMENT)
+        drained = event.ticket_stock if event else 0
+
+        buckets = await StockBucket.find({"event_id": event_id}).to_list()
+        for bucket in buckets:
+            bucket = await StockBucket.find_one({
+                "_id": bucket.id
+            }).update(reset, response_type=UpdateResponse.OLD_DOCUMENT)
+            drained += bucket.ticket_stock if bucket else 0
+        return drained
+
+    async def _distribute(self, event_id: ObjectId, total: int,
+                          stock_buckets: int):
+        self._invalidate(str(event_id))
+        if stock_buckets <= 1:
+            self._sharded_events.discard(str(event_id))
+            await Event.find_one({
+                "_id": event_id
+            }).update({"$inc": {
+                "ticket_stock": total
+            }})
+            await StockBucket.find({"event_id": event_id}).delete()
+            return
+
+        self._sharded_events.add(str(event_id))
+        # Upsert semua bucket dalam satu round trip
+        await StockBucket.get_pymongo_collection().bulk_write([
+            UpdateOne({
+                "event_id": event_id,
+                "index": index
+            }, {"$inc": {
+                "ticket_stock": share
+            }},
+                      upsert=True)
+            for index, share in enumerate(
+                self._split_stock(total, stock_buckets))
+        ])
+        await StockBucket.find({
+            "event_id": event_id,
+            "index": {
+                "$gte": stock_buckets
+            }
+        }).delete()
+
+
+class AdmissionService():
+    """
+    Waiting room untuk pembelian tiket. Setiap worker membatasi pembelian
+    paralel per event dengan semaphore dan sisanya mengantri. Token bucket
+    pada MongoDB (opsional) membatasi laju pembelian dari semua worker.
+    Event yang sudah sold out langsung ditolak tanpa query ke database
+    """
+
+    def __init__(self, *, stock_service: StockService, concurrency: int,
+                 queue_size: int, queue_timeout: float, rate: float,
+                 burst: int):
+        self.stock_service = stock_service
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        # event_id -> [semaphore, jumlah request aktif + mengantri]
+        self._gates: Dict[str, list] = {}
+        # Rata-rata durasi satu pembelian (EMA) untuk estimasi retry-after
+        self._average_seconds = 0.05
+
+    def _reject(self, position: int, retry_after: float):
+        retry_after = max(1, math.ceil(retry_after))
+        raise APIError(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                       error_code="PURCHASE_QUEUE_FULL",
+                       data={
+                           "queue_position": position,
+                           "retry_after": retry_after
+                       },
+                       headers={"Retry-After": str(retry_after)})
+
+    def _estimate_wait(self, position: int):
+        return position / self.concurrency * self._average_seconds
+
+    def _check_sold_out(self, event_id: str):
+        if self.stock_service.is_sold_out(event_id):
+            raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
+                           error_code="QUOTA_EXHAUSTED")
+
+    async def _take_token(self, event_id: str, position: int):
+        if self.rate <= 0:
+            return
+
+        # Token diisi ulang berdasarkan waktu server ($$NOW) sejak update
+        # terakhir, lalu diambil satu jika tersedia. Semua dalam satu
+        # update atomic sehingga aman dipakai bersama oleh semua worker
+        elapsed = {
+            "$divide": [{
+                "$subtract": ["$$NOW", {
+                    "$ifNull": ["$updated_at", "$$NOW"]
+                }]
+            }, 1000]
+        }
+        bucket = await PurchaseRateBucket.get_pymongo_collection(
+        ).find_one_and_update({"_id": event_id}, [{
+            "$set": {
+                "tokens": {
+                    "$min": [
+                        self.burst, {
+                            "$add": [{
+                                "$ifNull": ["$tokens", self.burst]
+                            }, {
+                                "$multiply": [elapsed, self.rate]
+                            }]
+                        }
+                    ]
+                },
+                "updated_at": "$$NOW"
+            }
+        }, {
+            "$set": {
+                "granted": {
+                    "$gte": ["$tokens", 1]
+                }
+            }
+        }, {
+            "$set": {
+                "tokens": {
+                    "$cond": ["$granted", {
+                        "$subtract": ["$tokens", 1]
+                    }, "$tokens"]
+                }
+            }
+        }],
+                              upsert=True,
+                              return_document=ReturnDocument.AFTER)
+        if not bucket["granted"]:
+            self._reject(position, (1 - bucket["tokens"]) / self.rate)
+
+    @asynccontextmanager
+    async def admit(self, event_id: str):
+        self._check_sold_out(event_id)
+        if self.concurrency <= 0:
+            await self._take_token(event_id, 0)
+            yield
+            return
+
+        gate = self._gates.get(event_id)
+        if gate is None:
+            gate = [asyncio.Semaphore(self.concurrency), 0]
+            self._gates[event_id] = gate
+
+        # Posisi 0 berarti langsung diproses tanpa mengantri
+        position = max(gate[1] - self.concurrency + 1, 0)
+        if position > self.queue_size:
+            self._reject(position, self._estimate_wait(position))
+
+        gate[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(gate[0].acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject(position, self._estimate_wait(position))
+
+            try:
+                # Stock bisa habis selama request mengantri
+                self._check_sold_out(event_id)
+                await self._take_token(event_id, position)
+                started = time.monotonic()
+                yield
+                self._average_seconds = (0.9 * self._average_seconds + 0.1 *
+                                         (time.monotonic() - started))
+            finally:
+                gate[0].release()
+        finally:
+            gate[1] -= 1
+            if gate[1] == 0:
+                self._gates.pop(event_id, None)
+
+
+class IdempotencyService():
+    """
+    Menjalankan request paling banyak satu kali untuk setiap
+    "Idempotency-Key". Retry dengan key yang sama mendapatkan response
+    yang tersimpan tanpa menjalankan ulang pembelian
+    """
+
+    @staticmethod
+    def fingerprint(*parts):
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    async def _acquire(self, key: str, fingerprint: str):
+        """
+        Mengembalikan None jika request boleh dijalankan,
+        atau record yang sudah selesai untuk di-replay
+        """
+        try:
+            await IdempotencyRecord(id=key, fingerprint=fingerprint).insert()
+            return None
+        except DuplicateKeyError:
+            pass
+
+        record = await IdempotencyRecord.find_one({"_id": key})
+        if record is None:
+            # Record terhapus (TTL atau request pertama gagal), coba lagi
+            return await self._acquire(key, fingerprint)
+        if record.fingerprint != fingerprint:
+            raise APIError(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                           error_code="IDEMPOTENCY_KEY_REUSED")
+        if record.completed:
+            return record
+
+        # Mengambil alih record yang ditinggalkan oleh worker yang mati
+        stale = datetime.now(timezone.utc) - IDEMPOTENCY_PENDING_TIMEOUT
+        result = await IdempotencyRecord.find_one({
+            "_id": key,
+            "completed": False,
+            "created_at": {
+                "$lt": stale
+            }
+        }).update({"$set": {
+            "created_at": datetime.now(timezone.utc)
+        }})
+        if result.modified_count == 1:
+            return None
+        raise APIError(status_code=status.HTTP_409_CONFLICT,
+                       error_code="IDEMPOTENCY_KEY_IN_PROGRESS",
+                       headers={"Retry-After": "1"})
+
+    async def execute(self, key: Optional[str], fingerprint: str, action,
+                      status_code: int):
+        if key is None:
+            return await action()
+
+        record = await self._acquire(key, fingerprint)
+        if record is not None:
+            return JSONResponse(status_code=record.status_code,
+                                content=record.response,
+                                headers={"Idempotent-Replayed": "true"})
+
+        try:
+            response = await action()
+        except Exception:
+            # Pembelian yang gagal sudah dikompensasi, sehingga retry
+            # dengan key yang sama boleh menjalankan ulang pembelian
+            await IdempotencyRecord.find_one({"_id": key}).delete()
+            raise
+
+        content = response.model_dump(mode="json", by_alias=True)
+        await IdempotencyRecord.find_one({
+            "_id": key
+        }).update({
+            "$set": {
+                "completed": True,
+                "status_code": status_code,
+                "response": content
+            }
+        })
+        return JSONResponse(status_code=status_code, content=content)
+
+
+class EventStatsService():
+    """
+    Mengelola rangkuman event (EventStats) sehingga endpoint insights
+    cukup membaca satu dokumen tanpa agregasi seluruh tiket
+    """
+
+    async def _inc(self, event_id: str, values: dict, session=None):
+        # Tanpa upsert: event lama yang belum memiliki rangkuman akan
+        # dibangun ulang dari agregasi ketika pertama kali dibaca
+        await EventStats.find_one(
+            {"event_id": ObjectId(event_id)},
+            session=session).update({"$inc": values}, session=session)
+
+    async def create(self, event_id: str):
+        await EventStats(event_id=ObjectId(event_id)).insert()
+
+    async def delete(self, event_id: str):
+        await EventStats.find({"event_id": ObjectId(event_id)}).delete()
+
+    async def record_sale(self,
+                          event_id: str,
+                          tickets: List[TicketSold],
+                          session=None):
+        await self._inc(
+            event_id, {
+                "ticket_sold_count": len(tickets),
+                "total_revenue": sum(ticket.final_price for ticket in tickets)
+            }, session)
+
+    async def record_refund(self, ticket: TicketSold):
+        await self._inc(
+            ticket.event_id, {
+                "ticket_sold_count": -1,
+                "total_revenue": -ticket.final_price,
+                "total_attendees": -1 if ticket.status == "used" else 0
+            })
+
+    async def record_check_in(self, event_id: str, count: int = 1):
+        await self._inc(event_id, {"total_attendees": count})
+
+    async def get(self, event_id: str):
+        stats = await EventStats.find_one({"event_id": ObjectId(event_id)})
+        if stats:
+            return stats
+        return await self.rebuild(event_id)
+
+    async def rebuild(self, event_id: str):
+        """
+        Menghitung ulang rangkuman dari seluruh tiket event. Digunakan
+        ketika rangkuman belum ada atau tidak lagi sesuai (drift)
+        """
+        pipeline = [{
+            "$match": {
+                "event_id": ticket_event_filter(event_id)
+            }
+        }, {
+            "$group": {
+                "_id": None,
+                "total_revenue": {
+                    "$sum": "$final_price"
+                },
+                "ticket_sold_count": {
+                    "$sum": 1
+                },
+                "total_attendees": {
+                    "$sum": {
+                        "$cond": [{
+                            "$eq": ["$status", "used"]
+                        }, 1, 0]
+                    }
+                }
+            }
+        }]
+        result = await TicketSold.aggregate(pipeline).to_list()
+        values = {
+            "total_revenue": 0,
+            "ticket_sold_count": 0,
+            "total_attendees": 0
+        }
+        if result:
+            values = {key: result[0][key] for key in values}
+
+        await EventStats.get_pymongo_collection().update_one(
+            {"event_id": ObjectId(event_id)}, {"$set": values}, upsert=True)
+        return EventStats(event_id=ObjectId(event_id), **values)
+
+
+class CheckInCodeIndex():
+    """
+    Index in-memory per event yang memetakan angka pada kode tiket ke status
+    tiket (1 byte per kode). Kode dengan format salah, milik event lain, atau
+    sudah digunakan langsung ditolak tanpa query ke database. Kode yang belum
+    dikenal tetap diperiksa ke Mongo karena bisa saja dibeli melalui worker
+    lain, sedangkan penulisan selalu diteruskan ke Mongo. Hanya event yang
+    sedang dalam masa check-in yang di-index, maksimal "max_events" event
+    (yang paling lama tidak dipakai dikeluarkan lebih dulu)
+    """
+    UNKNOWN = 0
+    UNUSED = 1
+    USED = 2
+
+    def __init__(self, *, enabled: bool, max_events: int):
+        self.enabled = enabled
+        self.max_events = max_events
+        self._events: OrderedDict[str, bytearray] = OrderedDict()
+        self._warming: Dict[str, asyncio.Task] = {}
+        # Event yang tidak ada atau di luar masa check-in
+        self._skipped = TTLCache(max_size=CHECK_IN_INDEX_SKIP_SIZE,
+                                 ttl=CHECK_IN_INDEX_SKIP_TTL)
+
+    def _check_in_window(self):
+        now = datetime.now()
+        return {
+            "start_date": {
+                "$lte": now + CHECK_IN_INDEX_LOOKAHEAD
+            },
+            "end_date": {
+                "$gte": now
+            }
+        }
+
+    async def _load(self, event_id: str):
+        states = bytearray(TICKET_CODE_SPACE)
+        cursor = TicketSold.get_pymongo_collection().find(
+            {"event_id": ticket_event_filter(event_id)}, {
+                "_id": 0,
+                "code": 1,
+                "status": 1
+            })
+        async for ticket in cursor:
+            position = parse_ticket_code(ticket["code"])
+            if position is not None:
+                states[position] = (self.USED if ticket["status"] == "used"
+                                    else self.UNUSED)
+        self._events[event_id] = states
+        self._events.move_to_end(event_id)
+        while len(self._events) > self.max_events:
+            self._events.popitem(last=False)
+
+    async def warm(self, event_id: str):
+        # Event yang tidak ada atau di luar masa check-in tidak di-index
+        # agar event_id sembarang tidak menghabiskan memori
+        event = await Event.get_pymongo_collection().find_one(
+            {
+                "_id": ObjectId(event_id),
+                **self._check_in_window()
+            }, {"_id": 1})
+        if not event:
+            self._skipped.set(event_id, True)
+            return
+        await self._load(event_id)
+
+    async def warm_active_events(self):
+        events = Event.get_pymongo_collection().find(
+            self._check_in_window(), {
+                "_id": 1
+            }).sort("start_date", -1).limit(self.max_events)
+        async for event in events:
+            await self._load(str(event["_id"]))
+
+    def warm_in_background(self, event_id: str):
+        if (not self.enabled or event_id in self._warming
+                or self._skipped.get(event_id)):
+            return
+        task = asyncio.create_task(self.warm(event_id))
+        task.add_done_callback(lambda task: self._warmed(event_id, task))
+        self._warming[event_id] = task
+
+    def _warmed(self, event_id: str, task: asyncio.Task):
+        if self._warming.get(event_id) is task:
+            self._warming.pop(event_id)
+        # Jika gagal, event akan dicoba di-index ulang pada scan berikutnya
+        if not task.cancelled() and task.exception():
+            print(f"[CheckIn] gagal meng-index event {event_id}: "
+                  f"{task.exception()!r}")
+
+    def lookup(self, event_id: str, code: str):
+        """
+        Mengembalikan error code jika scan sudah pasti ditolak,
+        atau None jika scan harus diteruskan ke database
+        """
+        position = parse_ticket_code(code)
+        if position is None:
+            return "TICKET_NOT_FOUND"
+
+        states = self._events.get(event_id)
+        if states is None:
+            self.warm_in_background(event_id)
+            return None
+        self._events.move_to_end(event_id)
+
+        if states[position] == self.USED:
+            return "TICKET_ALREADY_USED"
+        if states[position] == self.UNKNOWN and any(
+                other[position] != self.UNKNOWN
+                for other_id, other in self._events.items()
+                if other_id != event_id):
+            return "TICKET_NOT_FOUND"
+        return None
+
+    def mark(self, event_id: str, code: str, state: int):
+        states = self._events.get(event_id)
+        position = parse_ticket_code(code)
+        if states is not None and position is not None:
+            states[position] = state
+
+    def drop(self, event_id: str):
+        task = self._warming.pop(event_id, None)
+        if task:
+            task.cancel()
+        self._events.pop(event_id, None)
+        self._skipped.invalidate(event_id)
+
+    def clear(self):
+        for event_id in list(self._warming):
+            self.drop(event_id)
+        self._events.clear()
+        self._skipped.clear()
+
+
+class EventDeletionService():
+    """
+    Menghapus tiket dari event yang sudah dihapus secara bertahap. Setiap
+    chunk mengambil "_id" berikutnya melalui index (event_id, _id) lalu
+    menghapus range tersebut dengan satu delete_many
+    """
+
+    def __init__(self, *, chunk_size: int, pause: float):
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._tasks: Dict[PydanticObjectId, asyncio.Task] = {}
+
+    async def start(self, event_id: str):
+        job = await EventDeletionJob(
+            event_id=ObjectId(event_id),
+            total_tickets=await TicketSold.get_pymongo_collection(
+            ).count_documents({"event_id": ticket_event_filter(event_id)
+                              })).insert()
+        self._run_in_background(job)
+        return job
+
+    async def get_job(self, job_id: str):
+        job = await EventDeletionJob.find_one({"_id": ObjectId(job_id)})
+        if not job:
+            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                           error_code="DELETION_JOB_NOT_FOUND")
+        return job
+
+    def _run_in_background(self, job: EventDeletionJob):
+        if job.id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job))
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        self._tasks[job.id] = task
+
+    async def _save(self, job: EventDeletionJob):
+        job.updated_at = datetime.now()
+        await EventDeletionJob.get_pymongo_collection().update_one(
+            {"_id": job.id}, {
+                "$set": {
+                    "status": job.status,
+                    "deleted_tickets": job.deleted_tickets,
+                    "last_id": job.last_id,
+                    "error": job.error,
+                    "updated_at": job.updated_at,
+                    "completed_at": job.completed_at
+                }
+            })
+
+    async def _run(self, job: EventDeletionJob):
+        tickets = TicketSold.get_pymongo_collection()
+        try:
+            while True:
+                query = {"event_id": ticket_event_filter(job.event_id)}
+                if job.last_id:
+                    query["_id"] = {"$gt": job.last_id}
+                batch = await tickets.find(query, {
+                    "_id": 1
+                }).sort("_id", 1).limit(self.chunk_size).to_list()
+                if not batch:
+                    break
+
+                result = await tickets.delete_many({
+                    "event_id": ticket_event_filter(job.event_id),
+                    "_id": {
+                        "$gte": batch[0]["_id"],
+                        "$lte": batch[-1]["_id"]
+                    }
+                })
+                job.deleted_tickets += result.deleted_count
+                job.last_id = batch[-1]["_id"]
+                # Sekaligus memperpanjang lease job
+                await self._save(job)
+                await asyncio.sleep(self.pause)
+
+            job.status = "completed"
+            job.completed_at = datetime.now()
+            await self._save(job)
+        except Exception as exc:
+            # Job tetap "running" dan dilanjutkan setelah lease berakhir
+            print(f"[Delete] gagal menghapus tiket event {job.event_id}: "
+                  f"{exc!r}")
+            job.error = repr(exc)
+            await self._save(job)
+
+    async def resume_stale_jobs(self):
+        """
+        Mengambil alih job yang tidak diperbarui selama EVENT_DELETION_LEASE
+        """
+        while True:
+            now = datetime.now()
+            document = await EventDeletionJob.get_pymongo_collection(
+            ).find_one_and_update(
+                {
+                    "status": "running",
+                    "updated_at": {
+                        "$lt": now - EVENT_DELETION_LEASE
+                    }
+                }, {"$set": {
+                    "updated_at": now
+                }},
+                return_document=ReturnDocument.AFTER)
+            if not document:
+                return
+            self._run_in_background(EventDeletionJob.model_validate(document))
+
+    async def resume_stale_jobs_periodically(self, interval: float):
+        while True:
+            try:
+                await self.resume_stale_jobs()
+            except Exception as exc:
+                print(f"[Delete] gagal melanjutkan job: {exc!r}")
+            await asyncio.sleep(interval)
+
+    def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+
 class EventService():
 
-    async def get_events(self):
-        return await Event.find().project(EventListResponse).to_list()
+    def __init__(self, *, stock_service: StockService,
+                 stats_service: EventStatsService,
+                 deletion_service: EventDeletionService,
+                 check_in_index: CheckInCodeIndex, event_cache: TTLCache,
+                 event_list_cache: TTLCache, raw_reads: bool):
+        self.stock_service = stock_service
+        self.stats_service = stats_service
+        self.deletion_service = deletion_service
+        self.check_in_index = check_in_index
+        self.event_cache = event_cache
+        self.event_list_cache = event_list_cache
+        self.raw_reads = raw_reads
+
+    def _events_query(self, after: Optional[str], limit: Optional[int]):
+        if self.raw_reads:
+            return find_raw(Event, after_cursor_filter(after),
+                            EventListResponse, limit)
+        return Event.find(after_cursor_filter(after)).sort("+_id").project(
+            EventListResponse).limit(limit)
+
+    async def get_events(self,
+                         limit: Optional[int] = None,
+                         after: Optional[str] = None):
+        page = self.event_list_cache.get((limit, after))
+        if page is not None:
+            return page
+
+        # Mengambil satu dokumen lebih untuk mengetahui ada halaman berikutnya
+        events = await self._events_query(after, limit +
+                                          1 if limit else None).to_list()
+        page = split_page(events, limit)
+        self.event_list_cache.set((limit, after), page)
+        return page
+
+    def stream_events(self,
+                      after: Optional[str] = None,
+                      limit: Optional[int] = None):
+        return self._events_query(after, limit)
 
     async def create_event(self, request: CreateEventRequest):
-        return await Event(
+        sharded = request.stock_buckets > 1
+        event = await Event(
             **request.dict(),
-            ticket_stock=request.ticket_quota,
+            ticket_stock=0 if sharded else request.ticket_quota,
         ).insert()
+        await self.stock_service.create(event)
+        await self.stats_service.create(str(event.id))
+        self.event_list_cache.clear()
+
+        event.ticket_stock = request.ticket_quota
+        return event
+
+    def _add_import_error(self, result: EventImportResponse, row: int,
+                          errors: List[str]):
+        result.error_count += 1
+        if len(result.errors) < IMPORT_MAX_ERRORS:
+            result.errors.append(ImportRowError(row=row, errors=errors))
+
+    async def _import_chunk(self, chunk: list, result: EventImportResponse):
+        events = []
+        rows = []
+        for row, record in chunk:
+            if isinstance(record, Exception):
+                self._add_import_error(result, row, [str(record)])
+                continue
+            # Baris tiket dari export dengan include_tickets
+            if record.get("record") == "ticket":
+                result.skipped += 1
+                continue
+            try:
+                request = CreateEventRequest.model_validate(record)
+            except ValidationError as exc:
+                self._add_import_error(result, row, [
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in exc.errors()
+                ])
+                continue
+
+            # "_id" dari hasil export dipertahankan, sehingga import ulang
+            # file yang sama tidak menduplikasi event
+            event_id = record.get("_id")
+            if event_id is not None and not ObjectId.is_valid(event_id):
+                self._add_import_error(result, row,
+                                       ["_id: invalid object id format"])
+                continue
+            events.append(
+                Event(id=PydanticObjectId(event_id)
+                      if event_id else PydanticObjectId(),
+                      **request.model_dump(),
+                      ticket_stock=0 if request.stock_buckets > 1 else
+                      request.ticket_quota))
+            rows.append(row)
+
+        if not events:
+            return
+
+        failed = set()
+        try:
+            await Event.insert_many(events, ordered=False)
+        except BulkWriteError as exc:
+            for error in exc.details["writeErrors"]:
+                failed.add(error["index"])
+                self._add_import_error(result, rows[error["index"]], [
+                    "_id: event already exists"
+                    if error["code"] == 11000 else error["errmsg"]
+                ])
+
+        inserted = [
+            event for index, event in enumerate(events) if index not in failed
+        ]
+        if not inserted:
+            return
+        await EventStats.insert_many(
+            [EventStats(event_id=event.id) for event in inserted])
+        for event in inserted:
+            await self.stock_service.create(event)
+        result.inserted += len(inserted)
+
+    async def import_events(self, rows):
+        """
+        Import event dari baris (nomor baris, dict). Validasi dan insert
+        dilakukan per IMPORT_CHUNK_SIZE baris dengan insert_many
+        (ordered=False), sehingga baris yang gagal tidak menghentikan
+        baris lain
+        """
+        result = EventImportResponse()
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await self._import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk, result)
+
+        if result.inserted:
+            self.event_list_cache.clear()
+        return result
+
+    async def export_events(self, export_format: Literal["ndjson", "csv"],
+                            include_tickets: bool):
+        """
+        Export event (dan tiketnya) sebagai stream per baris. Data dibaca
+        dengan cursor sehingga collection tidak dimuat ke memori
+        """
+        events = Event.get_pymongo_collection().find(
+            {}, {field: 1 for field in EVENT_EXPORT_FIELDS}).sort("_id", 1)
+
+        if export_format == "csv":
+            yield csv_line(EVENT_EXPORT_FIELDS)
+            async for event in events:
+                yield csv_line(event.get(field) for field in EVENT_EXPORT_FIELDS)
+            return
+
+        async for event in events:
+            if not include_tickets:
+                yield encode_json(event) + b"\n"
+                continue
+
+            yield encode_json({"record": "event", **event}) + b"\n"
+            tickets = TicketSold.get_pymongo_collection().find({
+                "event_id": ticket_event_filter(event["_id"])
+            }).sort("_id", 1)
+            async for ticket in tickets:
+                yield encode_json({"record": "ticket", **ticket}) + b"\n"
 
     async def update_event(self, event_id: str, request: CreateEventRequest):
         event = await Event.find_one({"_id": ObjectId(event_id)})
@@ -287,15 +2243,45 @@ class EventService():
             raise APIError(status_code=status.HTTP_404_NOT_FOUND,
                            error_code="EVENT_NOT_FOUND")
 
-        # Validasi quota: tidak boleh mengurangi quota dibawah yang sudah terjual
-        sold_count = await TicketSold.find({"event_id": event_id}).count()
+        # Validasi quota: tidak boleh mengurangi quota dibawah yang sudah
+        # terjual ditambah yang masih di-hold
+        sold_count = await TicketSold.find({
+            "event_id": ticket_event_filter(event_id)
+        }).count()
+        held = await TicketHold.aggregate([{
+            "$match": {
+                "event_id": ticket_event_filter(event_id),
+                "expires_at": {
+                    "$gt": datetime.now()
+                }
+            }
+        }, {
+            "$group": {
+                "_id": None,
+                "quantity": {
+                    "$sum": "$quantity"
+                }
+            }
+        }]).to_list()
+        held_count = held[0]["quantity"] if held else 0
 
-        if request.ticket_quota < sold_count:
+        if request.ticket_quota < sold_count + held_count:
             raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
                            error_code="INVALID_QUOTA")
 
         # Menghitung perbedaan quota
         quota_diff = request.ticket_quota - event.ticket_quota
+        event_window = (event.start_date, event.end_date)
+        stock_update = {"$inc": {"ticket_stock": quota_diff}}
+
+        # Sharded stock hanya didistribusikan ulang jika jumlah bucket berubah
+        if event.stock_buckets > 1 or request.stock_buckets > 1:
+            if event.stock_buckets != request.stock_buckets:
+                await self.stock_service.change_quota(event, quota_diff,
+                                                      request.stock_buckets)
+            else:
+                await self.stock_service.adjust_quota(event, quota_diff)
+            stock_update = {}
 
         for key, value in request.dict().items():
             setattr(event, key, value)
@@ -307,13 +2293,29 @@ class EventService():
                 request.ticket_quota,
                 "updated_at": datetime.now()
             },
-            "$inc": {
-                "ticket_stock": quota_diff
-            }
+            **stock_update
         })
 
+        # Salinan waktu event pada tiket ikut diperbarui
+        if event_window != (request.start_date, request.end_date):
+            await TicketSold.find({
+                "event_id": ticket_event_filter(event_id)
+            }).update({
+                "$set": {
+                    "event_start_date": request.start_date,
+                    "event_end_date": request.end_date
+                }
+            })
+            # Masa check-in berubah, event di-index ulang pada scan berikutnya
+            self.check_in_index.drop(event_id)
+
+        self.event_cache.invalidate(event_id)
+        self.event_list_cache.clear()
+
         # Mengembalikan document yang diperbarui
-        return await Event.find_one({"_id": ObjectId(event_id)})
+        event = await Event.find_one({"_id": ObjectId(event_id)})
+        event.ticket_stock = await self.stock_service.get_stock(event)
+        return event
 
     async def delete_event(self, event_id: str):
         event = await Event.find_one({"_id": ObjectId(event_id)})
@@ -321,15 +2323,47 @@ class EventService():
             raise APIError(status_code=status.HTTP_404_NOT_FOUND,
                            error_code="EVENT_NOT_FOUND")
         await event.delete()
+        await self.stock_service.delete(event_id)
+        await self.stats_service.delete(event_id)
+        await TicketHold.find({
+            "event_id": ticket_event_filter(event_id)
+        }).delete()
+        self.check_in_index.drop(event_id)
+        self.event_cache.invalidate(event_id)
+        self.event_list_cache.clear()
+        # Tiket dihapus di background karena jumlahnya bisa sangat besar
+        return await self.deletion_service.start(event_id)
 
     async def get_event(self, event_id: str):
-        event = await Event.find_one({
-            "_id": ObjectId(event_id)
-        }).project(EventDetailResponse)
+        # Metadata event jarang berubah sehingga di-cache lebih lama,
+        # sedangkan stock diambil dari cache dengan TTL singkat
+        event = self.event_cache.get(event_id)
+        if event is not None:
+            return event.model_copy(update={
+                "ticket_stock":
+                    await self.stock_service.get_cached_stock(event_id)
+            })
+
+        if self.raw_reads:
+            # Dokumen berasal dari database yang sudah tervalidasi saat
+            # ditulis, sehingga cukup dibungkus tanpa validasi ulang
+            document = await Event.get_pymongo_collection().find_one(
+                {"_id": ObjectId(event_id)},
+                projection_of(EventDetailResponse))
+            event = (EventDetailResponse.model_construct(**document)
+                     if document else None)
+        else:
+            event = await Event.find_one({
+                "_id": ObjectId(event_id)
+            }).project(EventDetailResponse)
         if not event:
             raise APIError(status_code=status.HTTP_404_NOT_FOUND,
                            error_code="EVENT_NOT_FOUND")
-        return event
+        event.ticket_stock = await self.stock_service.get_stock(event)
+
+        self.event_cache.set(event_id, event)
+        self.stock_service.stock_cache.set(event_id, event.ticket_stock)
+        return event.model_copy()
 
     async def get_event_insights(self, event_id: str):
         event = await Event.find_one({"_id": ObjectId(event_id)})
@@ -337,80 +2371,458 @@ class EventService():
             raise APIError(status_code=status.HTTP_404_NOT_FOUND,
                            error_code="EVENT_NOT_FOUND")
 
+        stats = await self.stats_service.get(event_id)
+        return EventInsightResponse(
+            total_revenue=stats.total_revenue,
+            total_attendees=stats.total_attendees,
+            ticket_sold_count=stats.ticket_sold_count,
+            ticket_stock=await self.stock_service.get_stock(event))
+
+    async def rebuild_event_insights(self, event_id: str):
+        if not await Event.find_one({"_id": ObjectId(event_id)}):
+            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                           error_code="EVENT_NOT_FOUND")
+
+        await self.stats_service.rebuild(event_id)
+        return await self.get_event_insights(event_id)
+
+
+class LiveFeedService():
+    """
+    Live feed stock dan check-in per event melalui server-sent events.
+    Satu change stream per proses (pada "events", "event_stats", dan
+    "stock_buckets") hanya menandai event yang berubah, lalu snapshot dibaca sekali per interval
+    untuk semua subscriber event tersebut. Tanpa replica set, setiap event
+    yang memiliki subscriber di-poll sekali per interval
+    """
+
+    def __init__(self, *, event_service: EventService, interval: float,
+                 use_change_stream: bool):
+        self.event_service = event_service
+        self.interval = interval
+        self.use_change_stream = use_change_stream
+        self.mode = "polling"
+        # event_id -> queue milik setiap subscriber
+        self._subscribers: Dict[str, set] = {}
+        # event_id -> (snapshot terakhir, waktu dikirim)
+        self._last: Dict[str, tuple] = {}
+        # _id EventStats/StockBucket -> event_id, karena change stream
+        # untuk update hanya membawa documentKey
+        self._document_ids: Dict[ObjectId, str] = {}
+        self._dirty = set()
+        self._tasks: List[asyncio.Task] = []
+
+    async def _snapshot(self, event_id: str):
+        insights = await self.event_service.get_event_insights(event_id)
+        return {"event_id": event_id, **insights.model_dump()}
+
+    def _start(self):
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._flush_periodically()))
+        if self.use_change_stream:
+            self._tasks.append(asyncio.create_task(self._watch_changes()))
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def _on_change(self, change: dict):
+        key = change["documentKey"]["_id"]
+        if change["ns"]["coll"] == Event.get_collection_name():
+            event_id = str(key)
+        elif key in self._document_ids:
+            event_id = self._document_ids[key]
+        else:
+            # Dokumen baru (misal bucket dari perubahan jumlah bucket)
+            # membawa event_id pada fullDocument
+            event_id = str(
+                change.get("fullDocument", {}).get("event_id", "")) or None
+            if event_id in self._subscribers:
+                self._document_ids[key] = event_id
+        if event_id in self._subscribers:
+            self._dirty.add(event_id)
+
+    async def _watch_changes(self):
+        database = Event.get_pymongo_collection().database
         pipeline = [{
             "$match": {
-                "event_id": event_id
+                "ns.coll": {
+                    "$in": [
+                        Event.get_collection_name(),
+                        EventStats.get_collection_name(),
+                        StockBucket.get_collection_name()
+                    ]
+                }
             }
         }, {
-            "$group": {
-                "_id": None,
-                "total_revenue": {
-                    "$sum": "$final_price"
-                },
-                "ticket_sold_count": {
-                    "$sum": 1
-                },
-                "total_attendees": {
-                    "$sum": {
-                        "$cond": [{
-                            "$eq": ["$status", "used"]
-                        }, 1, 0]
-                    }
-                }
+            "$project": {
+                "ns": 1,
+                "documentKey": 1,
+                "fullDocument.event_id": 1
             }
         }]
-        result = await TicketSold.aggregate(pipeline).to_list()
-        if not result:
-            return EventInsightResponse(total_revenue=0,
-                                        total_attendees=0,
-                                        ticket_sold_count=0)
-
-        return EventInsightResponse(
-            total_revenue=result[0]["total_revenue"],
-            total_attendees=result[0]["total_attendees"],
-            ticket_sold_count=result[0]["ticket_sold_count"])
-
-
-class TicketService():
+        while True:
+            try:
+                async with await database.watch(pipeline) as stream:
+                    self.mode = "change_stream"
+                    # Perubahan selama change stream terputus tidak terlihat
+                    self._dirty.update(self._subscribers)
+                    async for change in stream:
+                        self._on_change(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Standalone MongoDB tidak mendukung change stream
+                if self.mode != "polling":
+                    print(f"[Live] change stream terputus, polling: {exc!r}")
+                self.mode = "polling"
+            await asyncio.sleep(LIVE_FEED_RETRY)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            if self.mode == "polling":
+                dirty = set(self._subscribers)
+            else:
+                dirty = self._dirty & set(self._subscribers)
+                dirty.update(
+                    event_id for event_id in self._subscribers
+                    if now - self._last[event_id][1] > LIVE_FEED_RESYNC)
+            self._dirty = set()
+
+            for event_id in dirty:
+                try:
+                    await self._publish(event_id)
+                except Exception as exc:
+                    print(f"[Live] gagal mengirim update {event_id}: {exc!r}")
+
+    async def _publish(self, event_id: str):
+        # Subscriber terakhir bisa pergi selama flush menunggu query
+        # untuk event lain
+        if event_id not in self._subscribers:
+            return
+        previous, sent_at = self._last[event_id]
+        try:
+            snapshot = await self._snapshot(event_id)
+        except APIError as exc:
+            if exc.error_code != "EVENT_NOT_FOUND":
+                raise
+            self._broadcast(event_id, "deleted", {"event_id": event_id})
+            return
+
+        if event_id not in self._subscribers:
+            return
+        if (snapshot == previous and
+                time.monotonic() - sent_at <= LIVE_FEED_RESYNC):
+            return
+        self._last[event_id] = (snapshot, time.monotonic())
+        self._broadcast(
+            event_id, "update", {
+                **snapshot, "sold_delta":
+                    snapshot["ticket_sold_count"] -
+                    previous["ticket_sold_count"],
+                "checked_in_delta":
+                    snapshot["total_attendees"] - previous["total_attendees"]
+            })
+
+    def _broadcast(self, event_id: str, event: str, data: dict):
+        message = (event, data)
+        for queue in self._subscribers.get(event_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def _unsubscribe(self, event_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(event_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[event_id]
+            self._last.pop(event_id, None)
+            for document_id in [
+                    key for key, value in self._document_ids.items()
+                    if value == event_id
+            ]:
+                del self._document_ids[document_id]
+
+    async def open(self, event_id: str):
+        """
+        Mendaftarkan subscriber dan mengembalikan stream SSE. Hanya
+        subscriber pertama sebuah event yang membaca database, sehingga
+        event yang tidak ada menghasilkan 404 biasa
+        """
+        self._start()
+        if event_id not in self._subscribers:
+            snapshot = await self._snapshot(event_id)
+            documents = []
+            for document in (EventStats, StockBucket):
+                documents += await document.get_pymongo_collection().find(
+                    {
+                        "event_id": ObjectId(event_id)
+                    }, {
+                        "_id": 1
+                    }).to_list()
+            # Subscriber lain bisa mendaftar selama menunggu query
+            if event_id not in self._subscribers:
+                self._subscribers[event_id] = set()
+                self._last[event_id] = (snapshot, time.monotonic())
+                for document in documents:
+                    self._document_ids[document["_id"]] = event_id
+
+        queue = asyncio.Queue(maxsize=LIVE_FEED_QUEUE_SIZE)
+        self._subscribers[event_id].add(queue)
+        return self._stream(event_id, queue, self._last[event_id][0])
+
+    async def _stream(self, event_id: str, queue: asyncio.Queue,
+                      snapshot: dict):
+        try:
+            yield sse_message("snapshot", snapshot)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        queue.get(), LIVE_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield sse_message(event, data)
+                if event == "deleted":
+                    return
+        finally:
+            self._unsubscribe(event_id, queue)
+
+
+class TicketCodeAllocator():
+    """
+    Mengalokasikan kode tiket tanpa collision. Setiap worker me-reserve
+    satu blok sequence dari counter di Mongo, lalu membagikan kode dari
+    blok tersebut tanpa round trip tambahan
+    """
 
-    async def get_tickets(self, event_id: str):
-        return await TicketSold.find({
-            "event_id": event_id
-        }).project(TicketListResponse).to_list()
+    def __init__(self, *, block_size: int):
+        self.block_size = block_size
+        self._next_seq = 0
+        self._end_seq = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve_block(self):
+        counter = await Counter.get_pymongo_collection().find_one_and_update(
+            {"_id": TICKET_CODE_COUNTER_ID},
+            {"$inc": {
+                "value": self.block_size
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER)
+
+        end_seq = min(counter["value"], TICKET_CODE_SPACE)
+        start_seq = counter["value"] - self.block_size
+        if start_seq >= end_seq:
+            raise APIError(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                           error_code="TICKET_CODE_EXHAUSTED")
 
-    async def create_ticket(self, event_id: str,
-                            payment_method: Literal["cash", "online"]):
-        event = await Event.find_one({"_id": ObjectId(event_id)})
-        if not event:
-            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
-                           error_code="EVENT_NOT_FOUND")
+        self._next_seq = start_seq
+        self._end_seq = end_seq
 
-        # Store base_price BEFORE atomic update (update returns UpdateResult, not Event)
-        base_price = event.ticket_base_price
+    async def reserve_range(self, quantity: int):
+        """
+        Me-reserve sequence untuk banyak kode sekaligus (misal dataset
+        sintetis), mengembalikan sequence pertama
+        """
+        counter = await Counter.get_pymongo_collection().find_one_and_update(
+            {"_id": TICKET_CODE_COUNTER_ID}, {"$inc": {
+                "value": quantity
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER)
+        if counter["value"] > TICKET_CODE_SPACE:
+            await Counter.get_pymongo_collection().update_one(
+                {"_id": TICKET_CODE_COUNTER_ID}, {"$inc": {
+                    "value": -quantity
+                }})
+            raise APIError(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                           error_code="TICKET_CODE_EXHAUSTED")
+        return counter["value"] - quantity
+
+    def reset(self):
+        # Blok lokal tidak berlaku lagi setelah counter di-reset
+        self._next_seq = 0
+        self._end_seq = 0
+
+    async def next_code(self):
+        codes = await self.next_codes(1)
+        return codes[0]
+
+    async def next_codes(self, quantity: int):
+        codes = []
+        async with self._lock:
+            while len(codes) < quantity:
+                if self._next_seq >= self._end_seq:
+                    await self._reserve_block()
+                codes.append(generate_ticket_code(self._next_seq))
+                self._next_seq += 1
+        return codes
+
+    async def get_pool(self):
+        counter = await Counter.get(TICKET_CODE_COUNTER_ID)
+        allocated = min(counter.value if counter else 0, TICKET_CODE_SPACE)
+        # Sisa blok milik worker ini masih bisa dipakai
+        allocated -= self._end_seq - self._next_seq
+        return TicketCodePoolResponse(total=TICKET_CODE_SPACE,
+                                      allocated=allocated,
+                                      remaining=TICKET_CODE_SPACE - allocated)
 
-        # Mengurangi stock ticket pada event terkait
-        # Menggunakan atomic operator untuk menghindari race condition
-        result = await Event.find_one({
-            "_id": ObjectId(event_id),
-            "ticket_stock": {
-                "$gt": 0
-            }
-        }).update({"$inc": {
-            "ticket_stock": -1
-        }})
 
-        # Jika quota kurang dari ticket yang sudah terjual
-        if result.modified_count == 0:
-            raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
-                           error_code="QUOTA_EXHAUSTED")
+class TicketService():
 
-        # Jika menggunakan pembayaran "online" maka
-        # akan ditambahkan sebesar 25% dari base_price
-        final_price = base_price
-        if payment_method == "online":
-            final_price += base_price * 0.25
+    def __init__(self, *, stock_service: StockService,
+                 stats_service: EventStatsService,
+                 check_in_index: CheckInCodeIndex,
+                 code_allocator: TicketCodeAllocator,
+                 admission: AdmissionService, use_transactions: bool,
+                 raw_reads: bool, hold_ttl: float):
+        self.stock_service = stock_service
+        self.admission = admission
+        self.hold_ttl = hold_ttl
+        self.stats_service = stats_service
+        self.check_in_index = check_in_index
+        self.code_allocator = code_allocator
+        self.use_transactions = use_transactions
+        self.raw_reads = raw_reads
+
+    def _tickets_query(self, event_id: str, after: Optional[str],
+                       limit: Optional[int]):
+        query = {
+            "event_id": ticket_event_filter(event_id),
+            **after_cursor_filter(after)
+        }
+        if self.raw_reads:
+            return find_raw(TicketSold, query, TicketListResponse, limit)
+        return TicketSold.find(query).sort("+_id").project(
+            TicketListResponse).limit(limit)
+
+    async def get_tickets(self,
+                          event_id: str,
+                          limit: Optional[int] = None,
+                          after: Optional[str] = None):
+        # Mengambil satu dokumen lebih untuk mengetahui ada halaman berikutnya
+        tickets = await self._tickets_query(event_id, after, limit +
+                                            1 if limit else None).to_list()
+        return split_page(tickets, limit)
+
+    def stream_tickets(self,
+                       event_id: str,
+                       after: Optional[str] = None,
+                       limit: Optional[int] = None):
+        return self._tickets_query(event_id, after, limit)
+
+    def _client(self) -> AsyncMongoClient:
+        return Event.get_pymongo_collection().database.client
+
+    async def _in_transaction(self, callback):
+        """
+        Menjalankan callback(session) dalam transaction. with_transaction
+        mengulang callback ketika terjadi TransientTransactionError (misal
+        WriteConflict pada dokumen event saat on-sale) dan commit ketika
+        terjadi UnknownTransactionCommitResult
+        """
+        async with self._client().start_session() as session:
+            return await session.with_transaction(callback)
+
+    async def _issue_ticket(self,
+                            event: Event,
+                            payment_method: Literal["cash", "online"],
+                            code: str,
+                            session=None):
+        ticket = self._build_tickets(event, payment_method, [code])[0]
+        return await ticket.insert(session=session)
+
+    async def _purchase(self, event_id: str,
+                        payment_method: Literal["cash", "online"], code: str):
+        if not self.use_transactions:
+            event = await self.stock_service.reserve(event_id)
+            try:
+                ticket = await self._issue_ticket(event, payment_method, code)
+            except Exception:
+                # Tanpa transaction, stock dikembalikan secara manual
+                # agar tidak bocor ketika insert gagal
+                await self.stock_service.release(event_id)
+                raise
+            await self.stats_service.record_sale(event_id, [ticket])
+            return ticket
+
+        # Insert gagal akan me-rollback pengurangan stock
+        async def purchase(session):
+            event = await self.stock_service.reserve(event_id,
+                                                     session=session)
+            return await self._issue_ticket(event, payment_method, code,
+                                            session)
+
+        ticket = await self._in_transaction(purchase)
+        # Rekap di luar transaction agar transaction tidak berebut
+        # dokumen EventStats yang juga sering ditulis
+        await self.stats_service.record_sale(event_id, [ticket])
+        return ticket
 
-        # Memastikan agar tidak ada ticket dengan kode yang sama
+    def _build_tickets(self, event: Event,
+                       payment_method: Literal["cash", "online"],
+                       tickets_code: List[str]):
+        # "_id" dibuat di sisi client agar tiket yang sudah ter-insert
+        # dapat dihapus kembali ketika insert_many gagal di tengah jalan
+        return [
+            TicketSold(
+                id=PydanticObjectId(),
+                event_id=event.id,
+                code=code,
+                base_price=event.ticket_base_price,
+                final_price=calculate_final_price(event.ticket_base_price,
+                                                  payment_method),
+                payment_method=payment_method,
+                status="unused",
+                event_start_date=event.start_date,
+                event_end_date=event.end_date,
+            ) for code in tickets_code
+        ]
+
+    async def _purchase_many(self, event_id: str,
+                             payment_method: Literal["cash", "online"],
+                             tickets_code: List[str]):
+        quantity = len(tickets_code)
+        if not self.use_transactions:
+            event = await self.stock_service.reserve(event_id, quantity)
+            tickets = self._build_tickets(event, payment_method, tickets_code)
+            try:
+                await TicketSold.insert_many(tickets)
+            except Exception:
+                # Tanpa transaction, tiket yang sempat ter-insert dihapus
+                # dan stock dikembalikan secara manual agar tidak bocor
+                await TicketSold.find({
+                    "_id": {
+                        "$in": [ticket.id for ticket in tickets]
+                    }
+                }).delete()
+                await self.stock_service.release(event_id, quantity)
+                raise
+            await self.stats_service.record_sale(event_id, tickets)
+            return tickets
+
+        async def purchase(session):
+            event = await self.stock_service.reserve(event_id, quantity,
+                                                     session)
+            tickets = self._build_tickets(event, payment_method,
+                                          tickets_code)
+            await TicketSold.insert_many(tickets, session=session)
+            return tickets
+
+        tickets = await self._in_transaction(purchase)
+        await self.stats_service.record_sale(event_id, tickets)
+        return tickets
+
+    async def _retry_on_duplicate_code(self, purchase):
+        # Kode dari allocator selalu unik, retry hanya terjadi jika kode
+        # bertabrakan dengan tiket lama yang dibuat secara acak
         attempt = 0
         MAX_RETRIES = 10
 
@@ -424,22 +2836,191 @@ class TicketService():
                     error_code="TICKET_GENERATION_FAILED")
 
             try:
-                ticket = await TicketSold(
-                    event_id=event_id,
-                    code=generate_ticket_code(),
-                    base_price=base_price,
-                    final_price=final_price,
-                    payment_method=payment_method,
-                    status="unused",
-                ).insert()
-
-                break
-            except DuplicateKeyError:
+                return await purchase()
+            except (DuplicateKeyError, BulkWriteError) as exc:
+                if not is_duplicate_key_error(exc):
+                    raise
                 attempt += 1
                 continue
 
+    async def create_ticket(self, event_id: str,
+                            payment_method: Literal["cash", "online"]):
+        async with self.admission.admit(event_id):
+            return await self._retry_on_duplicate_code(
+                lambda: self._purchase_with_new_code(event_id,
+                                                     payment_method))
+
+    async def create_tickets(self, event_id: str,
+                             payment_method: Literal["cash", "online"],
+                             quantity: int):
+        async with self.admission.admit(event_id):
+            return await self._retry_on_duplicate_code(
+                lambda: self._purchase_many_with_new_codes(
+                    event_id, payment_method, quantity))
+
+    async def _purchase_with_new_code(
+            self, event_id: str, payment_method: Literal["cash", "online"]):
+        code = await self.code_allocator.next_code()
+        ticket = await self._purchase(event_id, payment_method, code)
+        self.check_in_index.mark(event_id, code, CheckInCodeIndex.UNUSED)
         return ticket
 
+    async def _purchase_many_with_new_codes(
+            self, event_id: str, payment_method: Literal["cash", "online"],
+            quantity: int):
+        tickets_code = await self.code_allocator.next_codes(quantity)
+        tickets = await self._purchase_many(event_id, payment_method,
+                                            tickets_code)
+        for code in tickets_code:
+            self.check_in_index.mark(event_id, code, CheckInCodeIndex.UNUSED)
+        return tickets
+
+    async def _create_hold(self, event_id: str,
+                           payment_method: Literal["cash", "online"],
+                           quantity: int):
+        hold = TicketHold(event_id=ObjectId(event_id),
+                          payment_method=payment_method,
+                          quantity=quantity,
+                          expires_at=datetime.now() +
+                          timedelta(seconds=self.hold_ttl))
+        if not self.use_transactions:
+            await self.stock_service.reserve(event_id, quantity)
+            try:
+                return await hold.insert()
+            except Exception:
+                await self.stock_service.release(event_id, quantity)
+                raise
+
+        async def create(session):
+            await self.stock_service.reserve(event_id, quantity, session)
+            return await hold.insert(session=session)
+
+        return await self._in_transaction(create)
+
+    async def hold_tickets(self, event_id: str,
+                           payment_method: Literal["cash", "online"],
+                           quantity: int):
+        """
+        Mengurangi stock dan menyimpan reservasi yang harus dikonfirmasi
+        sebelum "expires_at", misalnya setelah pembayaran online selesai
+        """
+        async with self.admission.admit(event_id):
+            return await self._create_hold(event_id, payment_method, quantity)
+
+    async def _claim_hold(self, hold_id: str):
+        # Hold dihapus secara atomic sehingga hanya satu request (confirm,
+        # cancel, atau pembersihan) yang dapat menggunakan stock-nya
+        hold = await TicketHold.get_pymongo_collection().find_one_and_delete({
+            "_id": ObjectId(hold_id),
+            "expires_at": {
+                "$gt": datetime.now()
+            }
+        })
+        if hold:
+            return hold
+
+        # Query tambahan hanya dilakukan ketika hold tidak dapat diklaim
+        if await TicketHold.find_one({"_id": ObjectId(hold_id)}):
+            raise APIError(status_code=status.HTTP_410_GONE,
+                           error_code="HOLD_EXPIRED")
+        raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                       error_code="HOLD_NOT_FOUND")
+
+    async def _issue_held_tickets(self, event: Event,
+                                  payment_method: Literal["cash", "online"],
+                                  quantity: int):
+        tickets_code = await self.code_allocator.next_codes(quantity)
+        tickets = self._build_tickets(event, payment_method, tickets_code)
+        try:
+            await TicketSold.insert_many(tickets)
+        except Exception:
+            await TicketSold.find({
+                "_id": {
+                    "$in": [ticket.id for ticket in tickets]
+                }
+            }).delete()
+            raise
+        return tickets
+
+    async def confirm_hold(self, hold_id: str):
+        """
+        Menerbitkan tiket dari hold. Stock tidak dikurangi lagi karena
+        sudah dikurangi ketika hold dibuat
+        """
+        hold = await self._claim_hold(hold_id)
+        event_id = str(hold["event_id"])
+        try:
+            event = await Event.find_one({"_id": ObjectId(event_id)})
+            if not event:
+                raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                               error_code="EVENT_NOT_FOUND")
+            tickets = await self._retry_on_duplicate_code(
+                lambda: self._issue_held_tickets(event, hold["payment_method"],
+                                                 hold["quantity"]))
+        except Exception:
+            # Hold sudah terhapus, stock dikembalikan agar tidak bocor
+            await self.stock_service.release(event_id, hold["quantity"])
+            raise
+
+        await self.stats_service.record_sale(event_id, tickets)
+        for ticket in tickets:
+            self.check_in_index.mark(event_id, ticket.code,
+                                     CheckInCodeIndex.UNUSED)
+        return tickets
+
+    async def cancel_hold(self, hold_id: str):
+        hold = await TicketHold.get_pymongo_collection().find_one_and_delete(
+            {"_id": ObjectId(hold_id)})
+        if not hold:
+            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                           error_code="HOLD_NOT_FOUND")
+        await self.stock_service.release(str(hold["event_id"]),
+                                         hold["quantity"])
+
+    async def release_expired_holds(self):
+        """
+        Mengembalikan stock dari hold yang kedaluwarsa. Setiap hold diklaim
+        dengan find_one_and_delete sehingga aman dijalankan oleh beberapa
+        worker sekaligus, lalu stock dikembalikan sekali per event
+        """
+        now = datetime.now()
+        collection = TicketHold.get_pymongo_collection()
+        expired = await collection.find({
+            "expires_at": {
+                "$lte": now
+            }
+        }, {
+            "event_id": 1,
+            "quantity": 1
+        }).limit(HOLD_SWEEP_BATCH_SIZE).to_list()
+
+        released: Dict[str, int] = {}
+        for hold in expired:
+            if await collection.find_one_and_delete(
+                {
+                    "_id": hold["_id"],
+                    "expires_at": {
+                        "$lte": now
+                    }
+                },
+                    projection={"_id": 1}):
+                event_id = str(hold["event_id"])
+                released[event_id] = (released.get(event_id, 0) +
+                                      hold["quantity"])
+
+        for event_id, amount in released.items():
+            await self.stock_service.release(event_id, amount)
+        return sum(released.values())
+
+    async def release_expired_holds_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.release_expired_holds()
+            except Exception as exc:
+                # Hold yang gagal diproses akan dicoba pada putaran berikutnya
+                print(f"[Hold] gagal mengembalikan hold kedaluwarsa: {exc!r}")
+
     async def delete_ticket(self, event_id: str, ticket_id: str):
         ticket = await TicketSold.find_one({"_id": ObjectId(ticket_id)})
         if not ticket:
@@ -449,44 +3030,483 @@ class TicketService():
         # Menghapus ticket dan langsung menggunakan atomic operator
         # untuk menambahkan stock ticket pada event terkait
         await ticket.delete()
-        await Event.find_one({
-            "_id": ObjectId(event_id)
-        }).update({"$inc": {
-            "ticket_stock": 1
-        }})
+        await self.stock_service.release(event_id)
+        await self.stats_service.record_refund(ticket)
+        self.check_in_index.mark(str(ticket.event_id), ticket.code,
+                                 CheckInCodeIndex.UNKNOWN)
 
     async def use_ticket(self, ticket_id: str):
-        # Memastikan apakah ticket dan event nya tersedia dan valid
-        ticket = await TicketSold.find_one({"_id": ObjectId(ticket_id)})
+        await self._check_in({"_id": ObjectId(ticket_id)})
+
+    async def use_ticket_by_code(self, event_id: str, code: str):
+        error_code = self.check_in_index.lookup(event_id, code)
+        if error_code:
+            raise APIError(status_code=status.HTTP_404_NOT_FOUND
+                           if error_code == "TICKET_NOT_FOUND" else
+                           status.HTTP_400_BAD_REQUEST,
+                           error_code=error_code)
+
+        try:
+            await self._check_in({
+                "code": code,
+                "event_id": ticket_event_filter(event_id)
+            })
+        except APIError as exc:
+            if exc.error_code == "TICKET_ALREADY_USED":
+                self.check_in_index.mark(event_id, code,
+                                         CheckInCodeIndex.USED)
+            raise
+
+    async def _check_in(self, ticket_filter: dict):
+        # Status dan waktu event diperiksa langsung pada filter update,
+        # sehingga check-in yang berhasil hanya membutuhkan satu query
+        now = datetime.now()
+        ticket = await TicketSold.find_one({
+            **ticket_filter,
+            "status": "unused",
+            "event_start_date": {
+                "$lte": now
+            },
+            "event_end_date": {
+                "$gte": now
+            }
+        }).update(
+            {"$set": {
+                "status": "used",
+                "used_at": now
+            }},
+            response_type=UpdateResponse.NEW_DOCUMENT)
+        if ticket:
+            await self.stats_service.record_check_in(ticket.event_id)
+            self.check_in_index.mark(str(ticket.event_id), ticket.code,
+                                     CheckInCodeIndex.USED)
+            return
+
+        # Query tambahan hanya dilakukan ketika check-in gagal
+        # untuk menentukan error yang sesuai
+        ticket = await TicketSold.find_one(ticket_filter)
         if not ticket:
             raise APIError(status_code=status.HTTP_404_NOT_FOUND,
                            error_code="TICKET_NOT_FOUND")
-        event = await Event.find_one({"_id": ObjectId(ticket.event_id)})
-        if not event:
-            raise APIError(status_code=status.HTTP_404_NOT_FOUND,
-                           error_code="EVENT_NOT_FOUND")
+
+        start_date = ticket.event_start_date
+        end_date = ticket.event_end_date
+        # Tiket lama belum memiliki salinan waktu event
+        if start_date is None or end_date is None:
+            event = await Event.find_one({"_id": ticket.event_id})
+            if not event:
+                raise APIError(status_code=status.HTTP_404_NOT_FOUND,
+                               error_code="EVENT_NOT_FOUND")
+            start_date = event.start_date
+            end_date = event.end_date
 
         # Jika event belum dimulai
-        if event.start_date > datetime.now():
+        if start_date > now:
             raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
                            error_code="EVENT_NOT_STARTED")
         # Jika event sudah berakhir
-        elif event.end_date < datetime.now():
+        elif end_date < now:
             raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
                            error_code="EVENT_ENDED")
+        elif ticket.status == "used":
+            raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
+                           error_code="TICKET_ALREADY_USED")
 
-        ticket = await TicketSold.find_one({
-            "_id": ObjectId(ticket_id),
+        result = await TicketSold.find_one({
+            "_id": ticket.id,
             "status": "unused"
         }).update({"$set": {
             "status": "used",
-            "used_at": datetime.now()
+            "used_at": now
         }})
 
-        if ticket.modified_count == 0:
+        if result.modified_count == 0:
             raise APIError(status_code=status.HTTP_400_BAD_REQUEST,
                            error_code="TICKET_ALREADY_USED")
 
+        await self.stats_service.record_check_in(ticket.event_id)
+        self.check_in_index.mark(str(ticket.event_id), ticket.code,
+                                 CheckInCodeIndex.USED)
+
+    async def use_tickets(self, scans: List[CheckInScan]):
+        """
+        Check-in banyak tiket sekaligus (sinkronisasi scanner offline).
+        Setiap scan dinilai berdasarkan "scanned_at", bukan waktu sinkronisasi
+        """
+        ticket_ids = [
+            ObjectId(scan.ticket_id)
+            for scan in scans
+            if scan.ticket_id and ObjectId.is_valid(scan.ticket_id)
+        ]
+        codes = [scan.code for scan in scans if scan.code]
+        tickets = await TicketSold.find({
+            "$or": [{
+                "_id": {
+                    "$in": ticket_ids
+                }
+            }, {
+                "code": {
+                    "$in": codes
+                }
+            }]
+        }).to_list()
+        tickets_by_id = {str(ticket.id): ticket for ticket in tickets}
+        tickets_by_code = {ticket.code: ticket for ticket in tickets}
+
+        # Tiket lama belum memiliki salinan waktu event
+        legacy_event_ids = {
+            ticket.event_id
+            for ticket in tickets
+            if ticket.event_start_date is None or ticket.event_end_date is None
+        }
+        events = {}
+        if legacy_event_ids:
+            events = {
+                event.id: event for event in await Event.find({
+                    "_id": {
+                        "$in": list(legacy_event_ids)
+                    }
+                }).to_list()
+            }
+
+        results = []
+        candidates = {}
+        for scan in scans:
+            ticket = (tickets_by_id.get(scan.ticket_id)
+                      if scan.ticket_id else tickets_by_code.get(scan.code))
+            result = CheckInScanResult(ticket_id=scan.ticket_id,
+                                       code=scan.code,
+                                       result="invalid")
+            results.append(result)
+
+            if not ticket:
+                result.error_code = "TICKET_NOT_FOUND"
+                continue
+            result.ticket_id = str(ticket.id)
+            result.code = ticket.code
+
+            start_date = ticket.event_start_date
+            end_date = ticket.event_end_date
+            if start_date is None or end_date is None:
+                event = events.get(ticket.event_id)
+                if not event:
+                    result.error_code = "EVENT_NOT_FOUND"
+                    continue
+                start_date = event.start_date
+                end_date = event.end_date
+
+            if start_date > scan.scanned_at:
+                result.error_code = "EVENT_NOT_STARTED"
+            elif end_date < scan.scanned_at:
+                result.error_code = "EVENT_ENDED"
+            elif ticket.status == "used" or result.ticket_id in candidates:
+                # Scan ganda pada batch yang sama dianggap sudah digunakan
+                result.result = "already_used"
+            else:
+                result.result = "used"
+                candidates[result.ticket_id] = (ticket, scan.scanned_at)
+
+        if candidates:
+            operations = [
+                UpdateOne({
+                    "_id": ticket.id,
+                    "status": "unused"
+                }, {"$set": {
+                    "status": "used",
+                    "used_at": scanned_at
+                }}) for ticket, scanned_at in candidates.values()
+            ]
+            write_result = await TicketSold.get_pymongo_collection(
+            ).bulk_write(operations, ordered=False)
+
+            # Ada check-in lain yang mendahului, periksa ulang hasilnya
+            if write_result.modified_count != len(candidates):
+                used = await TicketSold.find({
+                    "_id": {
+                        "$in": [ticket.id for ticket, _ in candidates.values()]
+                    }
+                }).to_list()
+                used_at = {str(ticket.id): ticket.used_at for ticket in used}
+                for result in results:
+                    if (result.result == "used" and
+                            used_at.get(result.ticket_id) !=
+                            candidates[result.ticket_id][1]):
+                        result.result = "already_used"
+
+            attendees = {}
+            for result in results:
+                if result.result == "already_used" or result.result == "used":
+                    ticket = tickets_by_id[result.ticket_id]
+                    self.check_in_index.mark(str(ticket.event_id),
+                                             ticket.code,
+                                             CheckInCodeIndex.USED)
+                if result.result == "used":
+                    event_id = candidates[result.ticket_id][0].event_id
+                    attendees[event_id] = attendees.get(event_id, 0) + 1
+            for event_id, count in attendees.items():
+                await self.stats_service.record_check_in(event_id, count)
+
+        return BatchCheckInResponse(
+            used_count=sum(result.result == "used" for result in results),
+            already_used_count=sum(result.result == "already_used"
+                                   for result in results),
+            invalid_count=sum(result.result == "invalid"
+                              for result in results),
+            results=results)
+
+
+class DatasetService():
+    """
+    Membuat dataset sintetis langsung melalui collection PyMongo dengan
+    bentuk dokumen yang sama seperti dokumen yang dibuat oleh service.
+    Dengan "seed" yang sama (dan "reference" yang sama) hasilnya identik
+    """
+
+    def __init__(self, *, code_allocator: TicketCodeAllocator):
+        self.code_allocator = code_allocator
+
+    def _object_id(self, rng: random.Random, created_at: datetime):
+        # ObjectId diawali timestamp pembuatan seperti ObjectId asli
+        return ObjectId(
+            int(created_at.timestamp()).to_bytes(4, "big") + rng.randbytes(8))
+
+    def _ticket_counts(self, rng: random.Random, spec: DatasetSpec):
+        """
+        Membagi total tiket ke setiap event mengikuti distribusi Zipf
+        (bobot 1 / rank^skew) dengan peringkat popularitas acak
+        """
+        ranks = list(range(1, spec.events + 1))
+        rng.shuffle(ranks)
+        weights = [1 / rank**spec.skew for rank in ranks]
+        total_weight = sum(weights)
+        shares = [spec.tickets * weight / total_weight for weight in weights]
+        counts = [int(share) for share in shares]
+        # Sisa pembulatan diberikan ke event dengan pecahan terbesar
+        remainder = spec.tickets - sum(counts)
+        for index in sorted(range(spec.events),
+                            key=lambda index: counts[index] - shares[index]
+                           )[:remainder]:
+            counts[index] += 1
+        return counts
+
+    def _event(self, rng: random.Random, spec: DatasetSpec, index: int,
+               reference: datetime, sold: int):
+        if rng.random() < spec.active_ratio:
+            start_date = reference - timedelta(hours=rng.uniform(1, 48))
+            end_date = reference + timedelta(days=rng.uniform(1, 30))
+        else:
+            duration = timedelta(days=rng.randint(1, 3))
+            offset = timedelta(days=rng.uniform(1, 180))
+            if rng.random() < 0.5:
+                start_date = reference - offset - duration
+            else:
+                start_date = reference + offset
+            end_date = start_date + duration
+        created_at = min(start_date - timedelta(days=rng.uniform(7, 60)),
+                         reference - timedelta(days=rng.uniform(0, 7)))
+
+        sold_out = rng.random() < spec.sold_out_ratio
+        quota = max(sold if sold_out else sold * SEED_QUOTA_RATIO, 1)
+        return {
+            "_id": self._object_id(rng, created_at),
+            "name": f"Event {index + 1}",
+            "description": "synthetic event for testing",
+            "start_date": start_date,
+            "end_date": end_date,
+            "location": rng.choice(SEED_LOCATIONS),
+            "ticket_base_price": float(rng.choice(SEED_BASE_PRICES)),
+            "ticket_quota": quota,
+            "ticket_stock": quota - sold,
+            "stock_buckets": 1,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }, created_at
+
+    def _tickets(self, rng: random.Random, spec: DatasetSpec, event: dict,
+                 event_created_at: datetime, reference: datetime, seq: int,
+                 quantity: int, stats: dict):
+        # Tiket dibeli antara event dibuat dan event selesai (atau saat ini)
+        window = (min(event["end_date"], reference) -
+                  event_created_at).total_seconds()
+        started = event["start_date"] <= reference
+        attended = (min(event["end_date"], reference) -
+                    event["start_date"]).total_seconds()
+
+        for code_seq in range(seq, seq + quantity):
+            created_at = event_created_at + timedelta(
+                seconds=rng.uniform(0, max(window, 0)))
+            payment_method = ("online" if rng.random() < spec.online_ratio
+                              else "cash")
+            final_price = calculate_final_price(event["ticket_base_price"],
+                                                payment_method)
+            used = started and rng.random() < spec.check_in_ratio
+            stats["total_revenue"] += final_price
+            stats["total_attendees"] += used
+            yield {
+                "_id": self._object_id(rng, created_at),
+                "event_id": event["_id"],
+                "code": generate_ticket_code(code_seq),
+                "payment_method": payment_method,
+                "base_price": event["ticket_base_price"],
+                "final_price": final_price,
+                "status": "used" if used else "unused",
+                "used_at": event["start_date"] +
+                           timedelta(seconds=rng.uniform(0, attended))
+                           if used else None,
+                "event_start_date": event["start_date"],
+                "event_end_date": event["end_date"],
+                "created_at": created_at,
+            }
+
+    async def _insert_parallel(self, collection, documents,
+                               spec: DatasetSpec):
+        """
+        Menjalankan insert_many per batch dengan maksimal
+        "spec.concurrency" batch yang berjalan bersamaan
+        """
+        pending = set()
+        batch = []
+        try:
+            for document in documents:
+                batch.append(document)
+                if len(batch) < spec.batch_size:
+                    continue
+                if len(pending) >= spec.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(
+                    asyncio.create_task(
+                        collection.insert_many(batch, ordered=False)))
+                batch = []
+            if batch:
+                pending.add(
+                    asyncio.create_task(
+                        collection.insert_many(batch, ordered=False)))
+            while pending:
+                done, pending = await asyncio.wait(pending)
+                for task in done:
+                    task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def generate(self, spec: DatasetSpec):
+        if spec.events == 0:
+            return DatasetSummary()
+        rng = random.Random(spec.seed)
+        reference = spec.reference or datetime.now()
+        counts = self._ticket_counts(rng, spec)
+        events = [
+            self._event(rng, spec, index, reference, sold)
+            for index, sold in enumerate(counts)
+        ]
+        # Kode di-reserve lebih dulu agar tidak ada event yang ter-insert
+        # ketika ruang kode tidak cukup
+        seq = await self.code_allocator.reserve_range(spec.tickets)
+        await Event.get_pymongo_collection().insert_many(
+            [event for event, _ in events])
+
+        stats = []
+
+        def tickets():
+            nonlocal seq
+            for (event, created_at), quantity in zip(events, counts):
+                event_stats = {
+                    "_id": self._object_id(rng, created_at),
+                    "event_id": event["_id"],
+                    "total_revenue": 0.0,
+                    "ticket_sold_count": quantity,
+                    "total_attendees": 0
+                }
+                stats.append(event_stats)
+                yield from self._tickets(rng, spec, event, created_at,
+                                         reference, seq, quantity,
+                                         event_stats)
+                seq += quantity
+
+        await self._insert_parallel(TicketSold.get_pymongo_collection(),
+                                    tickets(), spec)
+        await EventStats.get_pymongo_collection().insert_many(stats)
+        return DatasetSummary(
+            events=spec.events,
+            tickets=spec.tickets,
+            checked_in=sum(item["total_attendees"] for item in stats))
+
+
+class DatabaseResetService():
+    """
+    Reset database untuk development dan load test. Mode "drop" menghapus
+    collection beserta index-nya lalu membuat ulang index, jauh lebih cepat
+    daripada menghapus dokumen satu per satu pada dataset yang besar
+    """
+
+    def __init__(self, *, caches: Dict[str, TTLCache],
+                 code_allocator: TicketCodeAllocator,
+                 check_in_index: CheckInCodeIndex,
+                 deletion_service: EventDeletionService,
+                 dataset_service: DatasetService):
+        self.caches = caches
+        self.code_allocator = code_allocator
+        self.check_in_index = check_in_index
+        self.deletion_service = deletion_service
+        self.dataset_service = dataset_service
+
+    async def _delete_documents(self):
+        await Event.delete_all()
+        await TicketSold.delete_all()
+        await StockBucket.delete_all()
+        await EventStats.delete_all()
+        await PurchaseRateBucket.delete_all()
+        await TicketHold.delete_all()
+        await IdempotencyRecord.delete_all()
+        await EventDeletionJob.delete_all()
+
+    async def _drop_collections(self):
+        database = Event.get_pymongo_collection().database
+        # Hanya collection milik aplikasi, collection lain tidak tersentuh
+        for document in DOCUMENT_MODELS:
+            await database.drop_collection(document.get_collection_name())
+        # Index dibuat ulang sebelum response dikirim sehingga request
+        # berikutnya tidak berjalan tanpa index
+        await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+        # Counter kode tiket ikut terhapus
+        self.code_allocator.reset()
+
+    async def reset(self, mode: Literal["drop", "delete"], events: int,
+                    tickets_per_event: int):
+        # Ukuran dataset diperiksa sebelum data dihapus. Mode "delete"
+        # tidak me-reset counter kode tiket
+        available = TICKET_CODE_SPACE
+        if mode == "delete":
+            counter = await Counter.get(TICKET_CODE_COUNTER_ID)
+            available -= counter.value if counter else 0
+        if events * tickets_per_event > available:
+            raise APIError(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                           error_code="DATASET_TOO_LARGE")
+
+        started = time.perf_counter()
+        # Job penghapusan yang berjalan tidak relevan lagi
+        self.deletion_service.close()
+        if mode == "drop":
+            await self._drop_collections()
+        else:
+            await self._delete_documents()
+        for cache in self.caches.values():
+            cache.clear()
+        self.check_in_index.clear()
+
+        # Seluruh event aktif agar dataset langsung dapat dipakai untuk
+        # pembelian dan check-in
+        summary = await self.dataset_service.generate(
+            DatasetSpec(events=events, tickets=events * tickets_per_event))
+        return DatabaseResetResponse(
+            mode=mode,
+            seeded_events=summary.events,
+            seeded_tickets=summary.tickets,
+            duration_ms=round((time.perf_counter() - started) * 1000, 3))
+
 
 # [/SERVICE]
 
@@ -499,9 +3519,14 @@ class UtilController():
     """
     router = APIRouter()
 
-    def __init__(self, root_router: APIRouter):
+    def __init__(self, root_router: APIRouter, caches: Dict[str, TTLCache],
+                 metrics: Optional[RequestMetrics],
+                 reset_service: DatabaseResetService):
         self.router = APIRouter(tags=["utils"])
         self.root_router = root_router
+        self.caches = caches
+        self.metrics = metrics
+        self.reset_service = reset_service
 
         self._init_router()
 
@@ -523,13 +3548,23 @@ class UtilController():
                                ]
                            })
 
-    async def reset_database(self):
+    async def reset_database(
+            self,
+            mode: Literal["drop", "delete"] = "drop",
+            events: int = Query(default=0, ge=0),
+            tickets_per_event: int = Query(default=0,
+                                           ge=0,
+                                           le=TICKET_CODE_SPACE)):
         """
-        Reset database. Digunakan untuk kebutuhan development dan latihan
+        Reset database. Digunakan untuk kebutuhan development dan latihan.
+        Mode "drop" menghapus collection lalu membuat ulang index, mode
+        "delete" menghapus dokumen. "events" dan "tickets_per_event" mengisi
+        ulang database dengan dataset sintetis
         """
-        await Event.delete_all()
-        await TicketSold.delete_all()
-        return APIResponse(success=True, message="database reset successful")
+        data = await self.reset_service.reset(mode, events, tickets_per_event)
+        return APIResponse(success=True,
+                           message="database reset successful",
+                           data=data)
 
     async def health_check(self):
         """
@@ -543,7 +3578,30 @@ class UtilController():
 
         return APIResponse(success=True, message="health check successful")
 
+    def cache_stats(self):
+        """
+        Statistik cache (hit/miss) pada worker yang menerima request
+        """
+        return APIResponse(success=True,
+                           message="cache stats fetched successfully",
+                           data={
+                               name: cache.stats()
+                               for name, cache in self.caches.items()
+                           })
+
+    def get_metrics(self):
+        """
+        Metrics dalam format Prometheus untuk worker yang menerima request
+        """
+        return Response(content=self.metrics.render(),
+                        media_type=PROMETHEUS_MEDIA_TYPE)
+
     def _init_router(self):
+        if self.metrics is not None:
+            self.root_router.add_api_route("/metrics",
+                                           self.get_metrics,
+                                           methods=["GET"],
+                                           include_in_schema=False)
         self.root_router.add_api_route("/",
                                        self.root_page,
                                        methods=["GET"],
@@ -555,7 +3613,12 @@ class UtilController():
         self.router.add_api_route("/reset-database",
                                   self.reset_database,
                                   methods=["GET", "POST"],
-                                  response_model=APIResponse[None])
+                                  response_model=APIResponse[
+                                      DatabaseResetResponse])
+        self.router.add_api_route("/cache-stats",
+                                  self.cache_stats,
+                                  methods=["GET"],
+                                  response_model=APIResponse[dict])
 
 
 class EventController():
@@ -564,20 +3627,36 @@ class EventController():
     """
     router = APIRouter()
 
-    def __init__(self, *, event_service: EventService):
+    def __init__(self, *, event_service: EventService,
+                 live_feed: LiveFeedService, fast_json: bool):
         self.router = APIRouter(tags=["events"])
         self.event_service = event_service
+        self.live_feed = live_feed
+        self.fast_json = fast_json
 
         self._init_router()
 
-    async def get_events(self):
+    async def get_events(self,
+                         limit: Optional[int] = Query(default=None,
+                                                      gt=0,
+                                                      le=MAX_PAGE_LIMIT),
+                         after: Optional[str] = Depends(valid_cursor),
+                         stream: bool = False):
         """
-        Mengambil semua event
+        Mengambil semua event. Mendukung keyset pagination ("limit" dan
+        "after") serta mode streaming NDJSON ("stream=true")
         """
-        events = await self.event_service.get_events()
-        return APIResponse(success=True,
-                           message="events fetched successfully",
-                           data=events)
+        if stream:
+            return StreamingResponse(ndjson_stream(
+                self.event_service.stream_events(after, limit)),
+                                     media_type=NDJSON_MEDIA_TYPE)
+
+        events, next_cursor = await self.event_service.get_events(
+            limit, after)
+        return build_response(self.fast_json,
+                              message="events fetched successfully",
+                              data=events,
+                              meta={"next_cursor": next_cursor})
 
     async def create_event(self, request: CreateEventRequest):
         """
@@ -588,6 +3667,35 @@ class EventController():
                            message="event created successfully",
                            data=event)
 
+    async def import_events(self, request: Request):
+        """
+        Import event secara bulk dari NDJSON atau CSV (Content-Type
+        "text/csv"). Body dibaca secara streaming dan hasilnya berisi
+        error per baris
+        """
+        chunks = request.stream()
+        if request.headers.get("content-type", "").startswith(CSV_MEDIA_TYPE):
+            rows = iter_csv_rows(chunks)
+        else:
+            rows = iter_ndjson_rows(chunks)
+        data = await self.event_service.import_events(rows)
+        return APIResponse(success=True,
+                           message="events imported successfully",
+                           data=data)
+
+    async def export_events(self,
+                            export_format: Literal["ndjson", "csv"] = Query(
+                                default="ndjson", alias="format"),
+                            include_tickets: bool = False):
+        """
+        Export semua event (NDJSON atau CSV). "include_tickets=true" (NDJSON)
+        menambahkan tiket setelah setiap event dengan field "record"
+        """
+        return StreamingResponse(
+            self.event_service.export_events(export_format, include_tickets),
+            media_type=CSV_MEDIA_TYPE
+            if export_format == "csv" else NDJSON_MEDIA_TYPE)
+
     async def update_event(self,
                            request: CreateEventRequest,
                            event_id: str = Depends(valid_event_id)):
@@ -601,10 +3709,22 @@ class EventController():
 
     async def delete_event(self, event_id: str = Depends(valid_event_id)):
         """
-        Menghapus event
+        Menghapus event. Tiket event dihapus di background, progress dapat
+        dilihat melalui GET /event-deletions/{job_id}
+        """
+        job = await self.event_service.delete_event(event_id)
+        return APIResponse(success=True,
+                           message="event deleted successfully",
+                           data=job)
+
+    async def get_deletion_job(self, job_id: str = Depends(valid_job_id)):
+        """
+        Mengambil progress penghapusan tiket dari event yang dihapus
         """
-        await self.event_service.delete_event(event_id)
-        return APIResponse(success=True, message="event deleted successfully")
+        job = await self.event_service.deletion_service.get_job(job_id)
+        return APIResponse(success=True,
+                           message="event deletion job fetched successfully",
+                           data=job)
 
     async def get_event(self, event_id: str = Depends(valid_event_id)):
         """
@@ -625,6 +3745,29 @@ class EventController():
                            message="event insights fetched successfully",
                            data=data)
 
+    async def get_event_live(self, event_id: str = Depends(valid_event_id)):
+        """
+        Live feed stock dan check-in (server-sent events). Event "snapshot"
+        dikirim pertama kali, lalu "update" setiap kali ada perubahan
+        """
+        stream = await self.live_feed.open(event_id)
+        return StreamingResponse(stream,
+                                 media_type=SSE_MEDIA_TYPE,
+                                 headers={
+                                     "Cache-Control": "no-cache",
+                                     "X-Accel-Buffering": "no"
+                                 })
+
+    async def rebuild_event_insights(self,
+                                     event_id: str = Depends(valid_event_id)):
+        """
+        Menghitung ulang rangkuman event dari seluruh tiket
+        """
+        data = await self.event_service.rebuild_event_insights(event_id)
+        return APIResponse(success=True,
+                           message="event insights rebuilt successfully",
+                           data=data)
+
     def _init_router(self):
         self.router.add_api_route(
             "/events",
@@ -639,6 +3782,19 @@ class EventController():
             response_model=APIResponse[Event],
             status_code=status.HTTP_201_CREATED,
         )
+        # Didaftarkan sebelum "/events/{event_id}" agar tidak dianggap id
+        self.router.add_api_route(
+            "/events/import",
+            self.import_events,
+            methods=["POST"],
+            response_model=APIResponse[EventImportResponse],
+        )
+        self.router.add_api_route(
+            "/events/export",
+            self.export_events,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
         self.router.add_api_route(
             "/events/{event_id}",
             self.update_event,
@@ -649,7 +3805,13 @@ class EventController():
             "/events/{event_id}",
             self.delete_event,
             methods=["DELETE"],
-            response_model=APIResponse[None],
+            response_model=APIResponse[EventDeletionJob],
+        )
+        self.router.add_api_route(
+            "/event-deletions/{job_id}",
+            self.get_deletion_job,
+            methods=["GET"],
+            response_model=APIResponse[EventDeletionJob],
         )
         self.router.add_api_route(
             "/events/{event_id}",
@@ -663,6 +3825,18 @@ class EventController():
             methods=["GET"],
             response_model=APIResponse[EventInsightResponse],
         )
+        self.router.add_api_route(
+            "/events/{event_id}/live",
+            self.get_event_live,
+            methods=["GET"],
+            response_class=StreamingResponse,
+        )
+        self.router.add_api_route(
+            "/events/{event_id}/insights/rebuild",
+            self.rebuild_event_insights,
+            methods=["POST"],
+            response_model=APIResponse[EventInsightResponse],
+        )
 
 
 class TicketController():
@@ -671,32 +3845,124 @@ class TicketController():
     """
     router = APIRouter()
 
-    def __init__(self, *, ticket_service: TicketService):
+    def __init__(self, *, ticket_service: TicketService,
+                 idempotency_service: IdempotencyService, fast_json: bool):
         self.router = APIRouter(tags=["tickets"])
         self.ticket_service = ticket_service
+        self.idempotency_service = idempotency_service
+        self.fast_json = fast_json
 
         self._init_router()
 
-    async def get_tickets(self, event_id: str = Depends(valid_event_id)):
+    async def get_tickets(self,
+                          event_id: str = Depends(valid_event_id),
+                          limit: Optional[int] = Query(default=None,
+                                                       gt=0,
+                                                       le=MAX_PAGE_LIMIT),
+                          after: Optional[str] = Depends(valid_cursor),
+                          stream: bool = False):
         """
-        Mengambil semua tiket
+        Mengambil semua tiket. Mendukung keyset pagination ("limit" dan
+        "after") serta mode streaming NDJSON ("stream=true")
         """
-        tickets = await self.ticket_service.get_tickets(event_id)
-        return APIResponse(success=True,
-                           message="tickets fetched successfully",
-                           data=tickets)
+        if stream:
+            return StreamingResponse(ndjson_stream(
+                self.ticket_service.stream_tickets(event_id, after, limit)),
+                                     media_type=NDJSON_MEDIA_TYPE)
+
+        tickets, next_cursor = await self.ticket_service.get_tickets(
+            event_id, limit, after)
+        return build_response(self.fast_json,
+                              message="tickets fetched successfully",
+                              data=tickets,
+                              meta={"next_cursor": next_cursor})
 
     async def create_ticket(self,
                             request: CreateTicketRequest,
-                            event_id: str = Depends(valid_event_id)):
+                            event_id: str = Depends(valid_event_id),
+                            idempotency_key: Optional[str] = Header(
+                                default=None,
+                                max_length=IDEMPOTENCY_KEY_MAX_LENGTH)):
+        """
+        Membuat tiket baru. Header "Idempotency-Key" membuat retry
+        mendapatkan tiket yang sama tanpa membeli ulang
+        """
+
+        async def purchase():
+            ticket = await self.ticket_service.create_ticket(
+                event_id, request.payment_method)
+            return APIResponse(success=True,
+                               message="ticket created successfully",
+                               data=ticket)
+
+        return await self.idempotency_service.execute(
+            idempotency_key,
+            IdempotencyService.fingerprint("create_ticket", event_id,
+                                           request.model_dump_json()),
+            purchase, status.HTTP_201_CREATED)
+
+    async def create_tickets(self,
+                             request: CreateBulkTicketRequest,
+                             event_id: str = Depends(valid_event_id),
+                             idempotency_key: Optional[str] = Header(
+                                 default=None,
+                                 max_length=IDEMPOTENCY_KEY_MAX_LENGTH)):
+        """
+        Membuat beberapa tiket sekaligus (pembelian grup)
+        """
+
+        async def purchase():
+            tickets = await self.ticket_service.create_tickets(
+                event_id, request.payment_method, request.quantity)
+            return APIResponse(success=True,
+                               message="tickets created successfully",
+                               data=tickets)
+
+        return await self.idempotency_service.execute(
+            idempotency_key,
+            IdempotencyService.fingerprint("create_tickets", event_id,
+                                           request.model_dump_json()),
+            purchase, status.HTTP_201_CREATED)
+
+    async def hold_tickets(self,
+                           request: CreateTicketHoldRequest,
+                           event_id: str = Depends(valid_event_id),
+                           idempotency_key: Optional[str] = Header(
+                               default=None,
+                               max_length=IDEMPOTENCY_KEY_MAX_LENGTH)):
+        """
+        Mereservasi tiket sementara sebelum pembayaran selesai
+        """
+
+        async def hold():
+            ticket_hold = await self.ticket_service.hold_tickets(
+                event_id, request.payment_method, request.quantity)
+            return APIResponse(success=True,
+                               message="ticket hold created successfully",
+                               data=ticket_hold)
+
+        return await self.idempotency_service.execute(
+            idempotency_key,
+            IdempotencyService.fingerprint("hold_tickets", event_id,
+                                           request.model_dump_json()),
+            hold, status.HTTP_201_CREATED)
+
+    async def confirm_hold(self, hold_id: str = Depends(valid_hold_id)):
+        """
+        Mengonfirmasi hold menjadi tiket
+        """
+        tickets = await self.ticket_service.confirm_hold(hold_id)
+        return APIResponse(success=True,
+                           message="ticket hold confirmed successfully",
+                           data=tickets)
+
+    async def cancel_hold(self, hold_id: str = Depends(valid_hold_id)):
         """
-        Membuat tiket baru
+        Membatalkan hold dan mengembalikan stock
         """
-        ticket = await self.ticket_service.create_ticket(
-            event_id, request.payment_method)
+        await self.ticket_service.cancel_hold(hold_id)
         return APIResponse(success=True,
-                           message="ticket created successfully",
-                           data=ticket)
+                           message="ticket hold cancelled successfully")
 
     async def delete_ticket(self,
                             event_id: str = Depends(valid_event_id),
@@ -714,6 +3980,33 @@ class TicketController():
         await self.ticket_service.use_ticket(ticket_id)
         return APIResponse(success=True, message="ticket used successfully")
 
+    async def use_ticket_by_code(self,
+                                 code: str,
+                                 event_id: str = Depends(valid_event_id)):
+        """
+        Menggunakan tiket (check-in) berdasarkan kode pada tiket fisik
+        """
+        await self.ticket_service.use_ticket_by_code(event_id, code)
+        return APIResponse(success=True, message="ticket used successfully")
+
+    async def use_tickets(self, request: BatchCheckInRequest):
+        """
+        Menggunakan banyak tiket sekaligus (sinkronisasi scanner offline)
+        """
+        data = await self.ticket_service.use_tickets(request.scans)
+        return APIResponse(success=True,
+                           message="tickets check-in synced successfully",
+                           data=data)
+
+    async def get_code_pool(self):
+        """
+        Mengambil jumlah kode tiket yang masih tersedia
+        """
+        data = await self.ticket_service.code_allocator.get_pool()
+        return APIResponse(success=True,
+                           message="ticket code pool fetched successfully",
+                           data=data)
+
     def _init_router(self):
         self.router.add_api_route(
             "/tickets",
@@ -728,6 +4021,33 @@ class TicketController():
             response_model=APIResponse[TicketSold],
             status_code=status.HTTP_201_CREATED,
         )
+        self.router.add_api_route(
+            "/events/{event_id}/tickets/bulk",
+            self.create_tickets,
+            methods=["POST"],
+            response_model=APIResponse[List[TicketSold]],
+            status_code=status.HTTP_201_CREATED,
+        )
+        self.router.add_api_route(
+            "/events/{event_id}/holds",
+            self.hold_tickets,
+            methods=["POST"],
+            response_model=APIResponse[TicketHold],
+            status_code=status.HTTP_201_CREATED,
+        )
+        self.router.add_api_route(
+            "/holds/{hold_id}/confirm",
+            self.confirm_hold,
+            methods=["POST"],
+            response_model=APIResponse[List[TicketSold]],
+            status_code=status.HTTP_201_CREATED,
+        )
+        self.router.add_api_route(
+            "/holds/{hold_id}",
+            self.cancel_hold,
+            methods=["DELETE"],
+            response_model=APIResponse[None],
+        )
         self.router.add_api_route(
             "/tickets/{ticket_id}",
             self.delete_ticket,
@@ -740,6 +4060,24 @@ class TicketController():
             methods=["POST"],
             response_model=APIResponse[None],
         )
+        self.router.add_api_route(
+            "/events/{event_id}/tickets/code/{code}/check-in",
+            self.use_ticket_by_code,
+            methods=["POST"],
+            response_model=APIResponse[None],
+        )
+        self.router.add_api_route(
+            "/tickets/check-in/batch",
+            self.use_tickets,
+            methods=["POST"],
+            response_model=APIResponse[BatchCheckInResponse],
+        )
+        self.router.add_api_route(
+            "/ticket-codes",
+            self.get_code_pool,
+            methods=["GET"],
+            response_model=APIResponse[TicketCodePoolResponse],
+        )
 
 
 # [/CONTROLLER]
@@ -753,22 +4091,54 @@ class Application():
         self.settings = Settings()
         self.app = FastAPI(lifespan=self.lifespan)
         self.db_client: AsyncMongoClient = None
+        self.metrics = RequestMetrics()
+        self.instrumented = (self.settings.metrics_enabled or
+                             self.settings.server_timing_header)
 
         self._start_up()
 
     @asynccontextmanager
     async def lifespan(self, app: FastAPI):
         # Setup DB
-        self.db_client = AsyncMongoClient(self.settings.db_url)
+        event_listeners = [MongoCommandListener(self.metrics)
+                          ] if self.instrumented else []
+        pool_options = {
+            "maxPoolSize": self.settings.db_max_pool_size,
+            "minPoolSize": self.settings.db_min_pool_size,
+            "maxConnecting": self.settings.db_max_connecting,
+            "readPreference": self.settings.db_read_preference,
+        }
+        if self.settings.db_compressors:
+            pool_options["compressors"] = self.settings.db_compressors
+        self.db_client = AsyncMongoClient(self.settings.db_url,
+                                          event_listeners=event_listeners,
+                                          **pool_options)
         self.db = self.db_client[self.settings.db_name]
 
         # Initialize Beanie
         # Beanie requires Motor (AsyncIOMotorClient)
         await init_beanie(database=self.db,
-                          document_models=[Event, TicketSold])
+                          document_models=DOCUMENT_MODELS,
+                          skip_indexes=not self.settings.db_create_indexes)
+
+        if self.check_in_index.enabled:
+            await self.check_in_index.warm_active_events()
+
+        # Stock dari hold yang kedaluwarsa dikembalikan di luar request
+        hold_sweeper = asyncio.create_task(
+            self.ticket_service.release_expired_holds_periodically(
+                self.settings.hold_sweep_interval))
+        # Melanjutkan penghapusan tiket yang terhenti
+        deletion_resumer = asyncio.create_task(
+            self.deletion_service.resume_stale_jobs_periodically(
+                EVENT_DELETION_RESUME_INTERVAL))
 
         yield
 
+        hold_sweeper.cancel()
+        deletion_resumer.cancel()
+        self.deletion_service.close()
+        self.live_feed.close()
         # Menutup koneksi
         await self.db_client.close()
 
@@ -780,15 +4150,90 @@ class Application():
                                        self._request_exception_handler)
         self.app.add_exception_handler(Exception,
                                        self._global_exception_handler)
+        if self.instrumented:
+            self.app.add_middleware(
+                MetricsMiddleware,
+                metrics=self.metrics,
+                server_timing=self.settings.server_timing_header)
 
         # Setup service
-        event_service = EventService()
-        ticket_service = TicketService()
+        self.check_in_index = CheckInCodeIndex(
+            enabled=self.settings.check_in_index,
+            max_events=self.settings.check_in_index_max_events)
+        event_cache = TTLCache(max_size=self.settings.event_cache_size,
+                               ttl=self.settings.event_cache_ttl)
+        event_list_cache = TTLCache(max_size=self.settings.event_cache_size,
+                                    ttl=self.settings.event_cache_ttl)
+        stock_cache = TTLCache(max_size=self.settings.event_cache_size,
+                               ttl=self.settings.stock_cache_ttl)
+        sold_out_cache = TTLCache(max_size=self.settings.event_cache_size,
+                                  ttl=self.settings.sold_out_cache_ttl)
+        stock_service = StockService(stock_cache=stock_cache,
+                                     sold_out_cache=sold_out_cache)
+        admission_service = AdmissionService(
+            stock_service=stock_service,
+            concurrency=self.settings.purchase_concurrency,
+            queue_size=self.settings.purchase_queue_size,
+            queue_timeout=self.settings.purchase_queue_timeout,
+            rate=self.settings.purchase_rate,
+            burst=self.settings.purchase_burst)
+        stats_service = EventStatsService()
+        self.deletion_service = EventDeletionService(
+            chunk_size=self.settings.event_delete_chunk_size,
+            pause=self.settings.event_delete_pause)
+        event_service = EventService(stock_service=stock_service,
+                                     stats_service=stats_service,
+                                     deletion_service=self.deletion_service,
+                                     check_in_index=self.check_in_index,
+                                     event_cache=event_cache,
+                                     event_list_cache=event_list_cache,
+                                     raw_reads=self.settings.raw_read_queries)
+        ticket_code_allocator = TicketCodeAllocator(
+            block_size=self.settings.ticket_code_block_size)
+        ticket_service = TicketService(
+            stock_service=stock_service,
+            stats_service=stats_service,
+            check_in_index=self.check_in_index,
+            code_allocator=ticket_code_allocator,
+            admission=admission_service,
+            use_transactions=self.settings.db_use_transactions,
+            raw_reads=self.settings.raw_read_queries,
+            hold_ttl=self.settings.ticket_hold_ttl)
+        self.ticket_service = ticket_service
 
         # setup controller
-        event_controller = EventController(event_service=event_service)
-        ticket_controller = TicketController(ticket_service=ticket_service)
-        util_controller = UtilController(root_router=self.app.router)
+        self.event_service = event_service
+        self.live_feed = LiveFeedService(
+            event_service=event_service,
+            interval=self.settings.live_feed_interval,
+            use_change_stream=self.settings.live_feed_change_stream)
+        event_controller = EventController(
+            event_service=event_service,
+            live_feed=self.live_feed,
+            fast_json=self.settings.fast_json_response)
+        ticket_controller = TicketController(
+            ticket_service=ticket_service,
+            idempotency_service=IdempotencyService(),
+            fast_json=self.settings.fast_json_response)
+        caches = {
+            "events": event_cache,
+            "event_list": event_list_cache,
+            "event_stock": stock_cache,
+            "sold_out": sold_out_cache
+        }
+        self.reset_service = DatabaseResetService(
+            caches=caches,
+            code_allocator=ticket_code_allocator,
+            check_in_index=self.check_in_index,
+            deletion_service=self.deletion_service,
+            dataset_service=DatasetService(
+                code_allocator=ticket_code_allocator))
+        util_controller = UtilController(root_router=self.app.router,
+                                         caches=caches,
+                                         metrics=self.metrics
+                                         if self.settings.metrics_enabled else
+                                         None,
+                                         reset_service=self.reset_service)
 
         # Setup controller dan router
         api_v1_router = APIRouter(prefix="/api/v1")
@@ -806,6 +4251,7 @@ class Application():
         response_model = APIResponse(
             success=False,
             message=exc.error_message,
+            data=exc.data,
             error=ErrorModel(
                 code=exc.error_code,
                 message=exc.error_message,
@@ -815,6 +4261,7 @@ class Application():
         return JSONResponse(
             status_code=exc.status_code,
             content=response_model.model_dump(mode="json"),
+            headers=exc.headers,
         )
 
     async def _starlette_exception_handler(self, request: Request,
@@ -844,12 +4291,20 @@ class Application():
         yang akan memberikan response error konsisten ketika terjadi
         form validation error
         """
+        # "ctx" dari model_validator dapat berisi objek exception
+        # yang tidak bisa di-serialize ke JSON
+        fields = [{
+            **error, "ctx": {
+                key: str(value) for key, value in error["ctx"].items()
+            }
+        } if "ctx" in error else error for error in exc.errors()]
+
         response_model = APIResponse(
             success=False,
             message="Validation Error",
             error=ErrorModel(code="PYDANTIC-422",
                              message="Validation Error",
-                             fields=exc.errors()),
+                             fields=fields),
         )
 
         return JSONResponse(
@@ -886,9 +4341,12 @@ main = instance.app
 # Jika dieksekusi sebagai script utama, jalankan uvicorn
 if __name__ == "__main__":
     print("[Eksekusi langsung]")
-    uvicorn.run(instance.app,
+    # Multi-worker membutuhkan import string agar setiap proses
+    # membuat Application (dan connection pool) sendiri
+    uvicorn.run("app:main" if instance.settings.workers > 1 else instance.app,
                 host=instance.settings.host,
-                port=instance.settings.port)
+                port=instance.settings.port,
+                workers=instance.settings.workers)
 else:
     print("[Menggunakan uvicorn sebagai executor]")
 
@@ -0,0 +1,245 @@
+"""
+Load test in-process untuk Ticketing API. Aplikasi dijalankan langsung
+(tanpa uvicorn) melalui ASGI transport milik httpx, lalu beberapa skenario
+dijalankan secara berurutan:
+
+1. on_sale   : lonjakan pembelian tiket (POST /events/{id}/tickets)
+2. check_in  : gelombang check-in (POST /tickets/{id}/check-in)
+3. insights  : polling dashboard (GET /events/{id}/insights)
+4. listing   : daftar tiket yang besar (GET /tickets)
+
+Hasil (p50/p95/p99 dan request/detik) disimpan sebagai JSON agar dapat
+dibandingkan antar commit. Membutuhkan "httpx". Secara default menggunakan
+MongoDB lokal, atau "--in-memory" untuk menggunakan mongomock-motor.
+
+    python -m benchmarks.load --tickets 2000 --concurrency 50
+    python -m benchmarks.load --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values, percent: float):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def use_in_memory_database(app_module):
+    """
+    Mengganti AsyncMongoClient pada aplikasi dengan mongomock-motor. Hanya
+    untuk benchmark relatif: tidak ada latency jaringan maupun transaction
+    """
+    import mongomock.collection
+    import mongomock_motor
+
+    class InMemoryClient(mongomock_motor.AsyncMongoMockClient):
+
+        async def close(self):
+            pass
+
+    # pymongo async meng-await hasil aggregate(), sedangkan motor tidak
+    def awaitable_cursor(cursor):
+
+        async def resolve():
+            return cursor
+
+        return resolve().__await__()
+
+    mongomock_motor.AsyncLatentCommandCursor.__await__ = awaitable_cursor
+
+    # pymongo terbaru mengirim argumen "sort" pada UpdateOne
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    mongomock.collection.BulkOperationBuilder.add_update = (
+        lambda self, *args, sort=None, **kwargs: add_update(
+            self, *args, **kwargs))
+
+    app_module.AsyncMongoClient = InMemoryClient
+
+
+async def run_scenario(name: str, requests, concurrency: int):
+    """
+    Menjalankan kumpulan request (coroutine factory) dengan sejumlah
+    worker paralel, lalu menghitung latency dan throughput
+    """
+    latencies = []
+    errors = 0
+    queue = list(requests)
+    queue.reverse()
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            send = queue.pop()
+            started = time.perf_counter()
+            response = await send()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+    print(f"{name:>9}: {result['requests']:6d} req, {result['errors']:5d} err,"
+          f" {result['rps']:9.2f} req/s, p50 {result['p50_ms']:8.3f} ms,"
+          f" p95 {result['p95_ms']:8.3f} ms, p99 {result['p99_ms']:8.3f} ms")
+    return result
+
+
+async def run(args):
+    os.environ["DB_URL"] = args.db_url
+    os.environ["DB_NAME"] = args.db_name
+
+    import app as app_module
+    if args.in_memory:
+        use_in_memory_database(app_module)
+
+    instance = app_module.Application()
+    transport = httpx.ASGITransport(app=instance.app)
+    scenarios = {}
+
+    async with instance.app.router.lifespan_context(instance.app):
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://benchmark/api/v1") as c:
+            await c.post("/reset-database")
+
+            now = datetime.now()
+            response = await c.post("/events",
+                                    json={
+                                        "name": "Benchmark Event",
+                                        "description": "load test event",
+                                        "start_date": (now - timedelta(days=1)
+                                                      ).isoformat(),
+                                        "end_date": (now + timedelta(days=1)
+                                                    ).isoformat(),
+                                        "location": "Benchmark",
+                                        "ticket_base_price": 100,
+                                        "ticket_quota": args.tickets,
+                                        "stock_buckets": args.stock_buckets,
+                                    })
+            event_id = response.json()["data"]["_id"]
+
+            scenarios["on_sale"] = await run_scenario(
+                "on_sale", [
+                    lambda: c.post(f"/events/{event_id}/tickets",
+                                   json={"payment_method": "online"})
+                    for _ in range(args.tickets)
+                ], args.concurrency)
+
+            tickets = []
+            after = None
+            while True:
+                params = {"event_id": event_id, "limit": 1000}
+                if after:
+                    params["after"] = after
+                page = (await c.get("/tickets", params=params)).json()
+                tickets.extend(ticket["_id"] for ticket in page["data"])
+                after = page["meta"]["next_cursor"]
+                if not after:
+                    break
+
+            scenarios["check_in"] = await run_scenario(
+                "check_in", [(lambda ticket_id=ticket_id: c.post(
+                    f"/tickets/{ticket_id}/check-in")) for ticket_id in tickets
+                            ], args.concurrency)
+
+            scenarios["insights"] = await run_scenario(
+                "insights", [
+                    lambda: c.get(f"/events/{event_id}/insights")
+                    for _ in range(args.polls)
+                ], args.concurrency)
+
+            scenarios["listing"] = await run_scenario(
+                "listing", [
+                    lambda: c.get("/tickets", params={"event_id": event_id})
+                    for _ in range(args.listings)
+                ], min(args.concurrency, args.listings))
+
+    return {
+        "commit": current_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "database": "in-memory" if args.in_memory else args.db_url,
+        "parameters": {
+            "tickets": args.tickets,
+            "concurrency": args.concurrency,
+            "polls": args.polls,
+            "listings": args.listings,
+            "stock_buckets": args.stock_buckets,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(current: dict, previous: dict):
+    print(f"\nperbandingan dengan {previous['commit']}:")
+    for name, result in current["scenarios"].items():
+        before = previous["scenarios"].get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                diff = (result[key] - before[key]) / before[key] * 100
+                changes.append(f"{key} {diff:+.1f}%")
+        print(f"{name:>9}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--db-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="ticketing_benchmark")
+    parser.add_argument("--in-memory", action="store_true")
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=1000)
+    parser.add_argument("--listings", type=int, default=20)
+    parser.add_argument("--stock-buckets", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nhasil disimpan di {output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark biaya per dokumen pada endpoint list:
+hidrasi model Pydantic (Beanie projection + APIResponse) dibandingkan
+dengan dict BSON mentah yang langsung di-encode.
+
+Tidak membutuhkan MongoDB, dokumen dibuat dengan bentuk yang sama seperti
+hasil projection pymongo. Jalankan dari root project:
+
+    python -m benchmarks.projection --documents 10000
+"""
+
+import argparse
+import time
+from typing import List
+
+from bson.objectid import ObjectId
+from pydantic import TypeAdapter
+
+from app import APIResponse, TicketListResponse, build_response, orjson
+
+
+ADAPTER = TypeAdapter(APIResponse[List[TicketListResponse]])
+
+
+def make_documents(count: int):
+    return [{
+        "_id": ObjectId(),
+        "code": f"MANBD-{100000 + index}",
+        "base_price": 100.0,
+        "final_price": 125.0,
+        "payment_method": "online",
+        "status": "unused",
+    } for index in range(count)]
+
+
+def hydrated(documents):
+    # Jalur lama: Beanie membuat model per dokumen, lalu FastAPI
+    # memvalidasi ulang APIResponse dan men-serialize-nya
+    tickets = [
+        TicketListResponse.model_validate(document) for document in documents
+    ]
+    response = APIResponse(success=True,
+                           message="tickets fetched successfully",
+                           data=tickets)
+    content = ADAPTER.validate_python(response.model_dump(by_alias=True))
+    return ADAPTER.dump_json(content, by_alias=True)
+
+
+def raw(documents):
+    # Jalur baru: dict BSON dari projection server langsung di-encode
+    return build_response(True,
+                          message="tickets fetched successfully",
+                          data=documents,
+                          meta={}).body
+
+
+def measure(function, documents, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(documents)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents)
+    print(f"documents: {args.documents}, "
+          f"encoder: {'orjson' if orjson else 'json'}")
+    for name, function in (("hydrated", hydrated), ("raw", raw)):
+        elapsed = measure(function, documents, args.repeat)
+        print(f"{name:>9}: {elapsed * 1000:8.2f} ms total, "
+              f"{elapsed / args.documents * 1e6:6.2f} us/document")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Perintah administrasi untuk Ticketing API. Menggunakan konfigurasi yang
+sama dengan aplikasi (file .env).
+
+    python manage.py indexes                  # membuat index + explain
+    python manage.py indexes --drop-obsolete  # hapus index yang tidak dipakai
+    python manage.py indexes --explain-only
+    python manage.py migrate-event-ids        # event_id tiket -> ObjectId
+    python manage.py import-events events.ndjson
+    python manage.py export-events --output events.ndjson --include-tickets
+    python manage.py generate --events 2000 --tickets 900000 --seed 42
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from beanie import init_beanie
+from bson.objectid import ObjectId
+from pymongo import AsyncMongoClient, UpdateOne
+
+from app import (CHECK_IN_INDEX_LOOKAHEAD, DOCUMENT_MODELS, DatasetSpec, Event,
+                 EventDeletionJob, EventStats, Settings, StockBucket,
+                 TicketHold, TicketSold, instance, iter_csv_rows,
+                 iter_ndjson_rows, ticket_event_filter)
+
+# Checkpoint migrasi disimpan pada collection "counters"
+EVENT_ID_MIGRATION_ID = "migration:tickets_sold.event_id"
+# Ukuran blok pembacaan file import
+IMPORT_READ_SIZE = 64 * 1024
+
+
+async def connect(settings: Settings, *, skip_indexes: bool = True,
+                  allow_index_dropping: bool = False):
+    client = AsyncMongoClient(settings.db_url)
+    await init_beanie(database=client[settings.db_name],
+                      document_models=DOCUMENT_MODELS,
+                      skip_indexes=skip_indexes,
+                      allow_index_dropping=allow_index_dropping)
+    return client
+
+
+def service_queries(event_id: ObjectId):
+    """
+    Query yang dijalankan oleh service, dengan nilai contoh.
+    Perbarui daftar ini ketika menambah query baru pada service
+    """
+    now = datetime.now()
+    any_id = ObjectId("0" * 24)
+    event_window = {
+        "event_start_date": {
+            "$lte": now
+        },
+        "event_end_date": {
+            "$gte": now
+        }
+    }
+    return [
+        ("get_events", Event, {
+            "filter": {
+                "_id": {
+                    "$gt": any_id
+                }
+            },
+            "sort": "_id",
+        }),
+        ("warm_active_events", Event, {
+            "filter": {
+                "start_date": {
+                    "$lte": now + CHECK_IN_INDEX_LOOKAHEAD
+                },
+                "end_date": {
+                    "$gte": now
+                }
+            },
+            "sort": "start_date",
+        }),
+        ("get_tickets", TicketSold, {
+            "filter": {
+                "event_id": ticket_event_filter(event_id),
+                "_id": {
+                    "$gt": any_id
+                }
+            },
+            "sort": "_id",
+        }),
+        ("count_sold_tickets", TicketSold, {
+            "filter": {
+                "event_id": ticket_event_filter(event_id)
+            },
+        }),
+        ("use_ticket", TicketSold, {
+            "filter": {
+                "_id": any_id,
+                "status": "unused",
+                **event_window
+            },
+        }),
+        ("use_ticket_by_code", TicketSold, {
+            "filter": {
+                "event_id": ticket_event_filter(event_id),
+                "code": "MANBD-100000",
+                "status": "unused",
+                **event_window
+            },
+        }),
+        ("rebuild_event_insights", TicketSold, {
+            "pipeline": [{
+                "$match": {
+                    "event_id": ticket_event_filter(event_id)
+                }
+            }, {
+                "$group": {
+                    "_id": None,
+                    "total_revenue": {
+                        "$sum": "$final_price"
+                    }
+                }
+            }],
+        }),
+        ("reserve_stock_bucket", StockBucket, {
+            "filter": {
+                "event_id": event_id,
+                "index": 0,
+                "ticket_stock": {
+                    "$gte": 1
+                }
+            },
+        }),
+        ("get_event_stats", EventStats, {
+            "filter": {
+                "event_id": event_id
+            },
+        }),
+        ("delete_event_tickets", TicketSold, {
+            "filter": {
+                "event_id": ticket_event_filter(event_id),
+                "_id": {
+                    "$gte": any_id,
+                    "$lte": any_id
+                }
+            },
+        }),
+        ("resume_event_deletions", EventDeletionJob, {
+            "filter": {
+                "status": "running",
+                "updated_at": {
+                    "$lt": now
+                }
+            },
+        }),
+        ("release_expired_holds", TicketHold, {
+            "filter": {
+                "expires_at": {
+                    "$lte": now
+                }
+            },
+        }),
+    ]
+
+
+def plan_stages(plan: dict):
+    """
+    Mengambil nama stage dan index dari winning plan (classic maupun SBE)
+    """
+    plan = plan.get("queryPlan", plan)
+    stages = [(plan.get("stage"), plan.get("indexName"))]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages += plan_stages(child)
+    return stages
+
+
+def query_planner(explain: dict):
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"], explain.get("executionStats", {})
+    # Explain aggregate dengan $cursor di stage pertama
+    cursor = explain["stages"][0]["$cursor"]
+    return cursor["queryPlanner"], cursor.get("executionStats", {})
+
+
+async def explain_query(document, spec: dict):
+    collection = document.get_pymongo_collection()
+    if "pipeline" in spec:
+        return await collection.database.command(
+            "explain", {
+                "aggregate": collection.name,
+                "pipeline": spec["pipeline"],
+                "cursor": {}
+            },
+            verbosity="executionStats")
+
+    cursor = collection.find(spec["filter"])
+    if "sort" in spec:
+        cursor = cursor.sort(spec["sort"], 1)
+    return await cursor.limit(100).explain()
+
+
+async def report_plans():
+    """
+    Menampilkan plan setiap query service dan menandai collection scan.
+    Mengembalikan jumlah query yang melakukan collection scan
+    """
+    event = await Event.get_pymongo_collection().find_one({}, {"_id": 1})
+    event_id = event["_id"] if event else ObjectId()
+
+    collection_scans = 0
+    for name, document, spec in service_queries(event_id):
+        planner, stats = query_planner(await explain_query(document, spec))
+        stages = plan_stages(planner["winningPlan"])
+        indexes = [index for _, index in stages if index]
+        scanned = any(stage == "COLLSCAN" for stage, _ in stages)
+        collection_scans += scanned
+
+        print(f"{'COLLSCAN' if scanned else 'ok':>8}  {name:<24} "
+              f"{document.get_collection_name():<22} "
+              f"{' <- '.join(stage for stage, _ in stages):<28} "
+              f"index={','.join(indexes) or '-'} "
+              f"examined={stats.get('totalDocsExamined', '-')} "
+              f"returned={stats.get('nReturned', '-')}")
+    return collection_scans
+
+
+async def indexes(args):
+    settings = Settings()
+    if not args.explain_only:
+        # MongoDB 4.2+ membangun index tanpa mengunci collection selama
+        # proses build, sehingga aman dijalankan saat aplikasi berjalan
+        print("[Index] membuat index...")
+    client = await connect(settings,
+                           skip_indexes=args.explain_only,
+                           allow_index_dropping=args.drop_obsolete)
+    try:
+        for document in DOCUMENT_MODELS:
+            names = await document.get_pymongo_collection().index_information()
+            print(f"[Index] {document.get_collection_name()}: "
+                  f"{', '.join(names)}")
+        print()
+        collection_scans = await report_plans()
+    finally:
+        await client.close()
+
+    if collection_scans:
+        print(f"\n{collection_scans} query melakukan collection scan")
+        return 1
+    return 0
+
+
+async def migrate_event_ids(args):
+    """
+    Mengubah "event_id" pada tickets_sold dari string menjadi ObjectId per
+    batch secara berurutan berdasarkan "_id". Posisi terakhir disimpan
+    sebagai checkpoint sehingga migrasi dapat dihentikan dan dilanjutkan.
+    Rangkuman (event_stats) event yang tiketnya dikonversi dibangun ulang
+    setelah migrasi selesai
+    """
+    settings = Settings()
+    client = await connect(settings)
+    tickets = TicketSold.get_pymongo_collection()
+    checkpoints = tickets.database["counters"]
+    try:
+        remaining = await tickets.count_documents(
+            {"event_id": {
+                "$type": "string"
+            }})
+        print(f"[Migrasi] {remaining} tiket masih menggunakan event_id string")
+        if args.dry_run or remaining == 0:
+            return 0
+
+        checkpoint = None if args.restart else await checkpoints.find_one(
+            {"_id": EVENT_ID_MIGRATION_ID})
+        last_id = checkpoint["last_id"] if checkpoint else None
+        converted = 0
+        invalid = 0
+
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id else {}
+            batch = await tickets.find(query, {
+                "event_id": 1
+            }).sort("_id", 1).limit(args.batch_size).to_list()
+            if not batch:
+                break
+
+            pending = [
+                ticket for ticket in batch
+                if isinstance(ticket["event_id"], str)
+            ]
+            operations = [
+                # Filter event_id lama agar aman dijalankan bersamaan
+                # dengan aplikasi yang masih menulis tiket
+                UpdateOne({
+                    "_id": ticket["_id"],
+                    "event_id": ticket["event_id"]
+                }, {"$set": {
+                    "event_id": ObjectId(ticket["event_id"])
+                }})
+                for ticket in pending
+                if ObjectId.is_valid(ticket["event_id"])
+            ]
+            invalid += len(pending) - len(operations)
+            if operations:
+                result = await tickets.bulk_write(operations, ordered=False)
+                converted += result.modified_count
+
+            last_id = batch[-1]["_id"]
+            await checkpoints.update_one({"_id": EVENT_ID_MIGRATION_ID}, {
+                "$set": {
+                    "last_id": last_id
+                },
+                "$addToSet": {
+                    "event_ids": {
+                        "$each":
+                            list({
+                                ObjectId(ticket["event_id"])
+                                for ticket in pending
+                                if ObjectId.is_valid(ticket["event_id"])
+                            })
+                    }
+                }
+            },
+                                         upsert=True)
+            print(f"[Migrasi] {converted} dikonversi, "
+                  f"{invalid} event_id tidak valid, terakhir {last_id}")
+            if args.pause:
+                await asyncio.sleep(args.pause)
+
+        # Rangkuman yang dihitung ketika sebagian tiket masih string bisa
+        # kurang dari seharusnya
+        checkpoint = await checkpoints.find_one(
+            {"_id": EVENT_ID_MIGRATION_ID}) or {}
+        for event_id in checkpoint.get("event_ids", []):
+            await instance.event_service.stats_service.rebuild(str(event_id))
+        print(f"[Migrasi] rangkuman {len(checkpoint.get('event_ids', []))} "
+              f"event dibangun ulang")
+
+        await checkpoints.delete_one({"_id": EVENT_ID_MIGRATION_ID})
+        remaining = await tickets.count_documents(
+            {"event_id": {
+                "$type": "string"
+            }})
+        print(f"[Migrasi] selesai, {remaining} tiket masih string")
+        return 1 if remaining else 0
+    finally:
+        await client.close()
+
+
+async def read_chunks(file):
+    while chunk := file.read(IMPORT_READ_SIZE):
+        yield chunk
+
+
+async def import_events(args):
+    """
+    Import event dari file NDJSON/CSV melalui EventService, sama seperti
+    endpoint POST /events/import
+    """
+    export_format = args.format or ("csv" if args.file.endswith(".csv") else
+                                    "ndjson")
+    settings = Settings()
+    client = await connect(settings)
+    try:
+        with (sys.stdin.buffer
+              if args.file == "-" else open(args.file, "rb")) as file:
+            chunks = read_chunks(file)
+            rows = iter_csv_rows(
+                chunks) if export_format == "csv" else iter_ndjson_rows(chunks)
+            result = await instance.event_service.import_events(rows)
+    finally:
+        await client.close()
+
+    for error in result.errors:
+        print(f"[Import] baris {error.row}: {'; '.join(error.errors)}",
+              file=sys.stderr)
+    print(f"[Import] {result.inserted} event di-import, {result.skipped} "
+          f"dilewati, {result.error_count} gagal")
+    return 1 if result.error_count else 0
+
+
+async def export_events(args):
+    settings = Settings()
+    client = await connect(settings)
+    try:
+        with (sys.stdout.buffer
+              if args.output == "-" else open(args.output, "wb")) as file:
+            async for line in instance.event_service.export_events(
+                    args.format, args.include_tickets):
+                file.write(line)
+    finally:
+        await client.close()
+    return 0
+
+
+async def generate(args):
+    """
+    Membuat dataset sintetis berskala besar: popularitas event mengikuti
+    distribusi Zipf, campuran pembayaran cash/online, dan sebagian tiket
+    sudah check-in. Index dibuat lebih dulu agar sama dengan production
+    """
+    spec = DatasetSpec(events=args.events,
+                       tickets=args.tickets,
+                       seed=args.seed,
+                       skew=args.skew,
+                       online_ratio=args.online_ratio,
+                       check_in_ratio=args.check_in_ratio,
+                       active_ratio=args.active_ratio,
+                       sold_out_ratio=args.sold_out_ratio,
+                       batch_size=args.batch_size,
+                       concurrency=args.concurrency,
+                       reference=args.reference)
+    settings = Settings()
+    client = await connect(settings, skip_indexes=False)
+    try:
+        if args.drop:
+            await instance.reset_service.reset("drop", 0, 0)
+        started = time.perf_counter()
+        summary = await instance.reset_service.dataset_service.generate(spec)
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.close()
+
+    print(f"[Dataset] {summary.events} event, {summary.tickets} tiket "
+          f"({summary.checked_in} check-in) dalam {elapsed:.1f} detik "
+          f"({summary.tickets / max(elapsed, 1e-9):.0f} tiket/detik)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser(
+        "indexes", help="membuat index dan menampilkan explain plan")
+    index_parser.add_argument("--drop-obsolete",
+                              action="store_true",
+                              help="hapus index yang tidak didefinisikan")
+    index_parser.add_argument("--explain-only",
+                              action="store_true",
+                              help="hanya menampilkan explain plan")
+    index_parser.set_defaults(handler=indexes)
+
+    migrate_parser = commands.add_parser(
+        "migrate-event-ids", help="ubah event_id tiket menjadi ObjectId")
+    migrate_parser.add_argument("--batch-size", type=int, default=1000)
+    migrate_parser.add_argument("--pause",
+                                type=float,
+                                default=0,
+                                help="jeda antar batch (detik)")
+    migrate_parser.add_argument("--restart",
+                                action="store_true",
+                                help="abaikan checkpoint dan mulai dari awal")
+    migrate_parser.add_argument("--dry-run",
+                                action="store_true",
+                                help="hanya menghitung tiket yang belum")
+    migrate_parser.set_defaults(handler=migrate_event_ids)
+
+    import_parser = commands.add_parser(
+        "import-events", help="import event dari file NDJSON atau CSV")
+    import_parser.add_argument("file", help='path file, "-" untuk stdin')
+    import_parser.add_argument("--format",
+                               choices=["ndjson", "csv"],
+                               help="default berdasarkan ekstensi file")
+    import_parser.set_defaults(handler=import_events)
+
+    export_parser = commands.add_parser(
+        "export-events", help="export event (dan tiket) ke NDJSON atau CSV")
+    export_parser.add_argument("--output",
+                               default="-",
+                               help='path file, "-" untuk stdout')
+    export_parser.add_argument("--format",
+                               choices=["ndjson", "csv"],
+                               default="ndjson")
+    export_parser.add_argument("--include-tickets",
+                               action="store_true",
+                               help="tambahkan tiket setelah setiap event "
+                               "(NDJSON)")
+    export_parser.set_defaults(handler=export_events)
+
+    generate_parser = commands.add_parser(
+        "generate", help="membuat dataset sintetis berskala besar")
+    generate_parser.add_argument("--events", type=int, default=1000)
+    generate_parser.add_argument("--tickets",
+                                 type=int,
+                                 default=100000,
+                                 help="total tiket (maksimal 900000)")
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--skew",
+                                 type=float,
+                                 default=1.1,
+                                 help="eksponen Zipf popularitas event")
+    generate_parser.add_argument("--online-ratio", type=float, default=0.6)
+    generate_parser.add_argument("--check-in-ratio",
+                                 type=float,
+                                 default=0.7,
+                                 help="peluang tiket event yang sudah dimulai "
+                                 "telah check-in")
+    generate_parser.add_argument("--active-ratio",
+                                 type=float,
+                                 default=0.1,
+                                 help="porsi event yang sedang berlangsung")
+    generate_parser.add_argument("--sold-out-ratio", type=float, default=0.2)
+    generate_parser.add_argument("--batch-size", type=int, default=5000)
+    generate_parser.add_argument("--concurrency",
+                                 type=int,
+                                 default=4,
+                                 help="insert_many yang berjalan bersamaan")
+    generate_parser.add_argument(
+        "--reference",
+        type=datetime.fromisoformat,
+        help="waktu acuan tanggal event (ISO 8601), default sekarang")
+    generate_parser.add_argument("--drop",
+                                 action="store_true",
+                                 help="drop collection aplikasi lebih dulu")
+    generate_parser.set_defaults(handler=generate)
+
+    args = parser.parse_args()
+    sys.exit(asyncio.run(args.handler(args)))
+
+
+if __name__ == "__main__":
+    main()